@@ -3,7 +3,20 @@
 # Assignment: 5 - Part 3: AVL Tree Implementation
 # Description: Defines two methods for use with a self-balancing AVL Tree that
 #              allow users to add objects to the tree and remove objects
-#              from the tree.
+#              from the tree. add() finds the new node's spot in a single
+#              descent and retraces only as far as heights keep changing,
+#              stopping after at most one rotation. remove() also searches
+#              once and stops retracing as soon as a subtree's height and
+#              balance are settled. from_sorted() and from_iterable() build a
+#              perfectly balanced tree directly from many objects at once.
+#              OrderStatisticAVL also keeps the size of every node's subtree,
+#              so it can rank values, select the k-th smallest value and
+#              count the values in a range in O(log n).
+#              Iterating over a tree (forward or reversed) generates its values
+#              in sorted order, range() generates only the values between two
+#              bounds, and floor(), ceiling(), predecessor() and successor()
+#              find the nearest values to any object. None of these recurse,
+#              so they work on trees of any height.
 
 
 import random
@@ -94,6 +107,11 @@ class TreeNode:
 
 
 class AVL:
+    # Whether nodes keep bookkeeping (such as subtree sizes) that changes in
+    # every ancestor of an added or removed node, so retracing must always
+    # reach the root even after heights stop changing
+    track_size = False
+
     def __init__(self, start_tree=None) -> None:
         """
         Initialize a new AVL tree
@@ -167,6 +185,63 @@ class AVL:
 
     # -----------------------------------------------------------------------
 
+    @classmethod
+    def from_sorted(cls, iterable) -> 'AVL':
+        """
+        Takes an iterable of objects in ascending order.
+
+        Returns a new, perfectly balanced AVL tree holding the objects, built
+        in linear time with no rotations. Repeated objects are kept once.
+
+        Raises ValueError if the objects are not in ascending order.
+        """
+        # Drops repeats, which are next to each other in sorted input, and
+        # rejects input that is out of order, which would give a broken tree
+        values = []
+        for value in iterable:
+            if values:
+                if value < values[-1]:
+                    raise ValueError('from_sorted() needs ascending input')
+                if value == values[-1]:
+                    continue
+            values.append(value)
+
+        tree = cls()
+        tree.root = tree._build_balanced(values, 0, len(values), None)
+        return tree
+
+    @classmethod
+    def from_iterable(cls, iterable) -> 'AVL':
+        """
+        Takes an iterable of objects in any order, possibly with repeats.
+
+        Returns a new, perfectly balanced AVL tree holding the objects. The
+        objects are sorted first, so this takes O(n log n) time, but unlike
+        adding them one at a time it does no rotations.
+        """
+        return cls.from_sorted(sorted(iterable))
+
+    def _build_balanced(self, values: list, start: int, end: int, parent):
+        """
+        Used internally to build a perfectly balanced subtree from the sorted
+        values between indices start (inclusive) and end (exclusive). The
+        recursion is only as deep as the finished tree is tall.
+
+        Returns the root node of the subtree.
+        """
+        if start >= end:
+            return None
+
+        # The middle value becomes the root, so both halves differ in size
+        # by at most one
+        middle = (start + end) // 2
+        node = TreeNode(values[middle])
+        node.parent = parent
+        node.left = self._build_balanced(values, start, middle, node)
+        node.right = self._build_balanced(values, middle + 1, end, node)
+        self._update_height(node)
+        return node
+
     def _contains(self, value):
         """
         Used internally to check for duplicate values.
@@ -285,6 +360,20 @@ class AVL:
         # the right and left child heights
         return right_height - left_height
 
+    def _replace_child(self, parent, old_child, new_child):
+        """
+        Used internally to put a new subtree in place of one of a parent's
+        children, found by identity. A parent of None means the old child was
+        the root of the tree.
+        """
+        new_child.parent = parent
+        if parent is None:
+            self.root = new_child
+        elif parent.left is old_child:
+            parent.left = new_child
+        else:
+            parent.right = new_child
+
     def _balance(self, node):
         """
         Used internally to check for re-balancing.
@@ -293,6 +382,8 @@ class AVL:
 
         Otherwise, if no re-balancing is needed, updates the heights from the
         new node.
+
+        Returns the root of the node's subtree after any rotation.
         """
 
         # Holds the original parent of the node being rotated
@@ -313,21 +404,10 @@ class AVL:
             # Calls for a right rotation and holds the resulting new subtree
             new_subtree_root = self._rotate_right(node)
 
-            # Sets the new subtree's parent as the original parent of the
-            # rotated node
-            new_subtree_root.parent = original_parent
-
-            # If the original parent is None, then the new subtree root node
-            # becomes the new root node of the tree
-            if original_parent is None:
-                self.root = new_subtree_root
-
-            # Else, if the original parent is a node, sets the correct child
-            # of the original parent as the new subtree
-            elif original_parent.left.value == node.value:
-                original_parent.left = new_subtree_root
-            elif original_parent.right.value == node.value:
-                original_parent.right = new_subtree_root
+            # Links the new subtree to the original parent of the rotated node
+            # in place of the rotated node (or makes it the root of the tree)
+            self._replace_child(original_parent, node, new_subtree_root)
+            return new_subtree_root
 
         # If there is a right imbalance
         elif balance_factor > 1:
@@ -342,94 +422,88 @@ class AVL:
             # Calls for a left rotation and holds the resulting new subtree
             new_subtree_root = self._rotate_left(node)
 
-            # Sets the new subtree's parent as the original parent of the
-            # rotated node
-            new_subtree_root.parent = original_parent
-
-            # If the original parent is None, then the new subtree root node
-            # becomes the new root node of the tree
-            if original_parent is None:
-                self.root = new_subtree_root
-
-            # Else, if the original parent is a node, sets the correct child
-            # of the original parent as the new subtree
-            elif original_parent.left.value == node.value:
-                original_parent.left = new_subtree_root
-            elif original_parent.right.value == node.value:
-                original_parent.right = new_subtree_root
+            # Links the new subtree to the original parent of the rotated node
+            # in place of the rotated node (or makes it the root of the tree)
+            self._replace_child(original_parent, node, new_subtree_root)
+            return new_subtree_root
 
         # Otherwise, if there are no imbalances large enough to necessitate a
         # re-balancing, updates the height starting with the node that was
         # passed to this method
-        else:
-            self._update_height(node)
+        self._update_height(node)
+        return node
 
-    def add(self, value: object) -> None:
+    def add(self, value: object) -> bool:
         """
         Takes an object to add to an AVL Tree.
 
-        Does nothing if the object is a duplicate of one already in the tree.
+        Does nothing if the object is a duplicate of one already in the tree,
+        and returns False.
 
-        Adds it to its correct position in the tree and re-balances the tree
-        if necessary.
+        Otherwise, adds it to its correct position in the tree, re-balances
+        the tree if necessary and returns True.
         """
 
-        # If the object is a duplicate, does nothing
-        if self._contains(value) is True:
-            return
-
-        # Instantiates a new node with the new object
-        new_node = TreeNode(value)
-
-        # If the root node is empty, sets the new node as the root node
+        # If the root node is empty, sets a new node as the root node
         if self.root is None:
-            self.root = new_node
+            self.root = TreeNode(value)
+            if self.track_size:
+                self._update_height(self.root)
+            return True
 
-        # Otherwise, adds the new node in its correct spot in the tree
-        else:
-            # Keeps track of the current node
-            cur = self.root
-            # Keeps track of the current node's parent node
-            cur_parent = None
-
-            # Iterates until the correct spot is found in the tree
-            while cur is not None:
-                # Updates the parent node
-                cur_parent = cur
-                # If the object being added is less than the current node,
-                # advances current to its own left child
-                if value < cur.value:
-                    cur = cur.left
-                # Otherwise if the object being added is greater than or equal
-                # to the current node, advances current to its own right child
-                else:
-                    cur = cur.right
+        # Keeps track of the current node
+        cur = self.root
 
-            # If the object being added is less than its parent's object, sets
-            # the new node as the left child of its new parent and sets the new
-            # node's parent as the current parent
-            if value < cur_parent.value:
-                cur_parent.left = new_node
-                new_node.parent = cur_parent
-            # Otherwise, sets the new node as the right child of its new parent
-            # and sets the new node's parent as the current parent
+        # Descends once from the root to the new node's spot, which also finds
+        # any duplicate on the way, since it would lie on the same path
+        while True:
+            # If the object is a duplicate, does nothing
+            if value == cur.value:
+                return False
+            # If the object being added is less than the current node, moves
+            # to the left child, or adds the new node there if it is empty
+            if value < cur.value:
+                if cur.left is None:
+                    new_node = TreeNode(value)
+                    cur.left = new_node
+                    break
+                cur = cur.left
+            # Otherwise, moves to the right child, or adds the new node there
             else:
-                cur_parent.right = new_node
-                new_node.parent = cur_parent
-
-            # Updates the heights of the nodes up the tree from the new node
-            cur_parent = new_node.parent
-            while cur_parent is not None:
-                self._update_height(cur_parent)
-                cur_parent = cur_parent.parent
-
-            # Checks at each level from the new node upwards, if the tree
-            # needs re-balancing by calling the parents of each node starting
-            # from the new node
-            balance_parent = new_node.parent
-            while balance_parent is not None:
-                self._balance(balance_parent)
-                balance_parent = balance_parent.parent
+                if cur.right is None:
+                    new_node = TreeNode(value)
+                    cur.right = new_node
+                    break
+                cur = cur.right
+
+        new_node.parent = cur
+        if self.track_size:
+            self._update_height(new_node)
+
+        # Retraces the descent back up through the parent pointers. Only the
+        # ancestors whose subtree grew taller need their heights updated.
+        cur = new_node.parent
+        while cur is not None:
+            old_height = cur.height
+            self._update_height(cur)
+
+            # A single (or double) rotation brings the subtree back to its
+            # height from before the insert, so nothing above it changes
+            balance_factor = self._balance_factor(cur)
+            if balance_factor < -1 or balance_factor > 1:
+                cur = self._balance(cur)
+                break
+
+            # If the subtree's height did not change, neither do any above it
+            if cur.height == old_height:
+                break
+
+            cur = cur.parent
+
+        if self.track_size and cur is not None:
+            self._update_ancestors(cur)
+
+        return True
 
     def remove(self, value: object) -> bool:
         """
@@ -439,14 +513,6 @@ class AVL:
         Otherwise, if not found, returns False.
         """
 
-        # If the root is empty, there is nothing to remove
-        if self.root is None:
-            return False
-
-        # If the object is not in the tree, returns False
-        if self._contains(value) is False:
-            return False
-
         # Keep track of the node being removed and its parent
         removing = self.root
         parent = None
@@ -464,9 +530,14 @@ class AVL:
                 parent = removing
                 removing = removing.right
 
-        # Keeps track of which nodes to update the height and balance from
+        # If the search fell off the tree (or the tree is empty), the object
+        # is not in the tree
+        if removing is None:
+            return False
+
+        # Keeps track of the lowest node whose subtree changed, where
+        # retracing starts
         update_height = parent
-        balance_parent = parent
 
         # If the removal node has no children
         if removing.left is None and removing.right is None:
@@ -522,6 +593,10 @@ class AVL:
                 successor_parent = successor
                 successor = successor.left
 
+            # The successor takes over the removal node's place, so it starts
+            # from that place's height for the retrace to compare against
+            successor.height = removing.height
+
             # If the in-order successor is the removal node's right child
             if removing.right.left is None:
                 successor.left = removing.left
@@ -537,9 +612,8 @@ class AVL:
                 else:
                     parent.right = successor
 
-                # Updates the two pointers for updating height and balancing
+                # Updates the pointer for updating height and balancing
                 update_height = successor_parent
-                balance_parent = successor_parent
 
             # Otherwise, if the in-order successor is not the removal node's
             # right child
@@ -564,24 +638,276 @@ class AVL:
                 else:
                     parent.right = successor
 
-                # Updates the pointers for updating height and balancing
+                # Updates the pointer for updating height and balancing
                 update_height = successor_parent
-                balance_parent = successor_parent
 
-        # Updates the height starting from the lowest node modified, moving up
-        # its parents in the tree until it reaches the root node
-        while update_height is not None:
-            self._update_height(update_height)
-            update_height = update_height.parent
+        # Updates heights and re-balances starting from the lowest node
+        # modified, moving up its parents in the tree
+        cur = update_height
+        while cur is not None:
+            old_height = cur.height
+            self._update_height(cur)
+
+            # A removal can need a rotation at every level, and a rotation can
+            # shrink the subtree, so retracing continues past rotations
+            balance_factor = self._balance_factor(cur)
+            if balance_factor < -1 or balance_factor > 1:
+                cur = self._balance(cur)
+
+            # If the subtree is balanced and kept its height, nothing above it
+            # changes
+            if cur.height == old_height:
+                break
+
+            cur = cur.parent
 
-        # Balances the tree starting from the lowest parent node modified,
-        # moving up its parents in the tree until it reaches the root node
-        while balance_parent is not None:
-            self._balance(balance_parent)
-            balance_parent = balance_parent.parent
+        if self.track_size and cur is not None:
+            self._update_ancestors(cur)
 
         return True
 
+    def _update_ancestors(self, node):
+        """
+        Used internally, when nodes track subtree sizes, to finish a retrace
+        that stopped early by updating every ancestor of a node up to the
+        root. Their heights are already settled, but their sizes are not.
+        """
+        cur = node.parent
+        while cur is not None:
+            self._update_height(cur)
+            cur = cur.parent
+
+    def __iter__(self):
+        """
+        Generates every value in the tree in ascending order.
+        """
+        return self._in_order(None, None, False)
+
+    def __reversed__(self):
+        """
+        Generates every value in the tree in descending order.
+        """
+        return self._in_order(None, None, True)
+
+    def range(self, lo: object, hi: object, reverse: bool = False):
+        """
+        Takes the bounds of a half-open range [lo, hi).
+
+        Generates the values in the tree that are at least lo and less than
+        hi, in ascending order (or descending, if reverse is True). Only the
+        nodes on the paths to the bounds and the nodes in the range are
+        visited.
+        """
+        return self._in_order(lo, hi, reverse)
+
+    def _in_order(self, lo, hi, reverse):
+        """
+        Used internally to generate the values in the tree between optional
+        bounds lo (inclusive) and hi (exclusive) in sorted order, using a
+        Stack in place of recursion.
+        """
+        stack = Stack()
+
+        # Pushes the path to the first value in the range. Nodes before the
+        # range are passed over without being pushed, along with one of
+        # their subtrees.
+        cur = self.root
+        while cur is not None:
+            if not reverse:
+                if lo is None or not cur.value < lo:
+                    stack.push(cur)
+                    cur = cur.left
+                else:
+                    cur = cur.right
+            else:
+                if hi is None or cur.value < hi:
+                    stack.push(cur)
+                    cur = cur.right
+                else:
+                    cur = cur.left
+
+        while not stack.is_empty():
+            node = stack.pop()
+
+            # Every node after this one is also past the end of the range
+            if not reverse and hi is not None and not node.value < hi:
+                return
+            if reverse and lo is not None and node.value < lo:
+                return
+
+            yield node.value
+
+            # Pushes the path to the next value, which is the first value of
+            # the subtree on the far side of the node
+            if not reverse:
+                cur = node.right
+                while cur is not None:
+                    stack.push(cur)
+                    cur = cur.left
+            else:
+                cur = node.left
+                while cur is not None:
+                    stack.push(cur)
+                    cur = cur.right
+
+    def _nearest(self, value, below, inclusive):
+        """
+        Used internally to find the closest value in the tree below (or above)
+        the specified object, and equal to it if inclusive is True.
+
+        Returns the value found.
+        Otherwise, if no value in the tree qualifies, returns None.
+        """
+        found = None
+        cur = self.root
+
+        while cur is not None:
+            if cur.value == value:
+                if inclusive:
+                    return cur.value
+                # The closest value is the nearest one in the node's subtree
+                # on the specified side, if it has one
+                cur = cur.left if below else cur.right
+            # Each qualifying node is closer than the last one found, and
+            # closer values can only be in its subtree toward the object
+            elif (cur.value < value) == below:
+                found = cur.value
+                cur = cur.right if below else cur.left
+            else:
+                cur = cur.left if below else cur.right
+
+        return found
+
+    def floor(self, value: object) -> object:
+        """
+        Takes an object to search for in the tree.
+
+        Returns the largest value in the tree that is less than or equal to
+        the object.
+        Otherwise, if there is none, returns None.
+        """
+        return self._nearest(value, True, True)
+
+    def ceiling(self, value: object) -> object:
+        """
+        Takes an object to search for in the tree.
+
+        Returns the smallest value in the tree that is greater than or equal
+        to the object.
+        Otherwise, if there is none, returns None.
+        """
+        return self._nearest(value, False, True)
+
+    def predecessor(self, value: object) -> object:
+        """
+        Takes an object to search for in the tree.
+
+        Returns the largest value in the tree that is less than the object.
+        Otherwise, if there is none, returns None.
+        """
+        return self._nearest(value, True, False)
+
+    def successor(self, value: object) -> object:
+        """
+        Takes an object to search for in the tree.
+
+        Returns the smallest value in the tree that is greater than the
+        object.
+        Otherwise, if there is none, returns None.
+        """
+        return self._nearest(value, False, False)
+
+
+class OrderStatisticAVL(AVL):
+    """
+    AVL tree whose nodes also keep the number of nodes in their subtree, as
+    node.size, so values can be ranked and selected in O(log n)
+    """
+    track_size = True
+
+    def _size(self, node):
+        """
+        Used internally to get the size of a node's subtree.
+
+        Returns the number of nodes in the subtree, or 0 for an empty one.
+        """
+        if node is None:
+            return 0
+        return node.size
+
+    def _update_height(self, node):
+        """
+        Used internally to update the height and subtree size of a node in
+        the tree. Every height update (in add, remove and both rotations)
+        goes through here, so sizes stay in step with heights.
+        """
+        super()._update_height(node)
+        node.size = self._size(node.left) + self._size(node.right) + 1
+
+    def size(self) -> int:
+        """
+        Returns the number of values in the tree.
+        """
+        return self._size(self.root)
+
+    def rank(self, value: object) -> int:
+        """
+        Takes an object to rank.
+
+        Returns the number of values in the tree that are less than it,
+        whether or not the object itself is in the tree.
+        """
+        count = 0
+        cur = self.root
+
+        while cur is not None:
+            # Everything in the left subtree is less than the current node
+            if value <= cur.value:
+                if value == cur.value:
+                    return count + self._size(cur.left)
+                cur = cur.left
+            # The current node and its left subtree are all less than value
+            else:
+                count += self._size(cur.left) + 1
+                cur = cur.right
+
+        return count
+
+    def select(self, k: int) -> object:
+        """
+        Takes a 0-based position k in sorted order.
+
+        Returns the k-th smallest value in the tree.
+        Otherwise, if k is out of range, returns None.
+        """
+        if k < 0 or k >= self.size():
+            return None
+
+        cur = self.root
+        while True:
+            left_size = self._size(cur.left)
+            # The k-th smallest value is in the left subtree
+            if k < left_size:
+                cur = cur.left
+            # The current node is the k-th smallest value
+            elif k == left_size:
+                return cur.value
+            # Skips the left subtree and the current node
+            else:
+                k -= left_size + 1
+                cur = cur.right
+
+    def count_range(self, lo: object, hi: object) -> int:
+        """
+        Takes the bounds of a half-open range [lo, hi).
+
+        Returns the number of values in the tree that are at least lo and
+        less than hi.
+        """
+        if not lo < hi:
+            return 0
+        return self.rank(hi) - self.rank(lo)
+
 
 # ------------------- BASIC TESTING -----------------------------------------
 
@@ -692,3 +1018,25 @@ if __name__ == '__main__':
         if not avl.is_valid_avl():
             raise Exception("PROBLEM WITH REMOVE OPERATION")
     print('remove() stress test finished')
+
+    print("\nfrom_sorted() / from_iterable() example")
+    print("---------------------------------------")
+    avl = AVL.from_sorted(range(0, 34, 3))
+    print(avl, avl.is_valid_avl())
+    avl = AVL.from_iterable([5, 3, 9, 3, 1, 7, 9])
+    print(avl, avl.is_valid_avl())
+
+    print("\nrank() / select() / count_range() example")
+    print("-----------------------------------------")
+    avl = OrderStatisticAVL([50, 20, 80, 10, 30, 70, 90, 60])
+    avl.remove(30)
+    print(avl, avl.size(), avl.rank(60), avl.select(3),
+          avl.count_range(15, 75), avl.is_valid_avl())
+
+    print("\nin-order iteration / range() / nearest values example")
+    print("-----------------------------------------------------")
+    avl = AVL.from_iterable(range(0, 100, 7))
+    print(list(avl), list(reversed(avl)))
+    print(list(avl.range(20, 50)), list(avl.range(20, 50, reverse=True)))
+    print(avl.floor(30), avl.ceiling(30), avl.predecessor(28),
+          avl.successor(28), avl.floor(-1), avl.ceiling(99))
@@ -0,0 +1,148 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - AVL Extensions: Benchmark
+# Description: Measures how many nodes AVL.add() and AVL.remove() visit per
+#              call on large trees. A subclass of AVL counts every height
+#              update, which is one visit per node retraced (rotated nodes
+#              are counted again), and the search depth of each value is
+#              measured before the call. The totals are compared with what
+#              the earlier add() and remove() visited for the same calls: a
+#              full search by _contains(), a second search, and two walks
+#              from the changed node up to the root, one updating heights and
+#              one checking balance.
+#
+#              Example:
+#                python avl_benchmark.py --size 1000000 --operations 100000
+
+
+import argparse
+import random
+import sys
+import time
+
+from avl import AVL
+
+
+class CountingAVL(AVL):
+    """
+    AVL tree that counts how many times a node's height is updated
+    """
+    height_updates = 0
+
+    def _update_height(self, node):
+        self.height_updates += 1
+        super()._update_height(node)
+
+
+def _depth(tree: AVL, value: object) -> tuple:
+    """
+    Used internally to find how many nodes a search for a value visits.
+
+    Returns a (nodes visited, depth of the node changed by removing or adding
+    the value) tuple. For a value in the tree with two children, the changed
+    node is the parent of its in-order successor.
+    """
+    visits = 0
+    cur = tree.root
+    parent = None
+    while cur is not None:
+        visits += 1
+        if cur.value == value:
+            break
+        parent = cur
+        cur = cur.left if value < cur.value else cur.right
+
+    # Value not in the tree: an add links it below the last node visited
+    if cur is None:
+        return visits, visits
+
+    changed_depth = visits - 1
+    if cur.left is not None and cur.right is not None:
+        changed_depth = visits
+        successor = cur.right
+        while successor.left is not None:
+            changed_depth += 1
+            successor = successor.left
+    return visits, changed_depth
+
+
+def _measure(tree: CountingAVL, method_name: str, values: list) -> dict:
+    """
+    Used internally to call a tree method with every value, counting search
+    and retrace visits.
+    """
+    method = getattr(tree, method_name)
+    search_visits = 0
+    earlier_visits = 0
+    retrace_visits = 0
+
+    start = time.perf_counter()
+    for value in values:
+        visits, changed_depth = _depth(tree, value)
+        search_visits += visits
+        # Two full searches plus two walks from the changed node to the root
+        earlier_visits += 2 * visits + 2 * changed_depth
+
+        before = tree.height_updates
+        method(value)
+        retrace_visits += tree.height_updates - before
+    seconds = time.perf_counter() - start
+
+    count = len(values)
+    return {
+        'operation': method_name,
+        'calls': count,
+        'search_visits': search_visits / count,
+        'retrace_visits': retrace_visits / count,
+        'total_visits': (search_visits + retrace_visits) / count,
+        'earlier_total_visits': earlier_visits / count,
+        'seconds': seconds,
+    }
+
+
+def main(argv: list = None) -> int:
+    """
+    Builds a tree of random values, then measures node visits per add of new
+    values and per remove of values in the tree.
+    """
+    parser = argparse.ArgumentParser(
+        description='Count node visits per AVL add and remove.')
+    parser.add_argument('--size', type=int, default=1000000,
+                        help='number of values in the tree')
+    parser.add_argument('--operations', type=int, default=100000,
+                        help='number of adds and of removes to measure')
+    parser.add_argument('--seed', type=int, default=261)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    values = rng.sample(range(args.size * 4), args.size + args.operations)
+    tree_values = values[:args.size]
+    new_values = values[args.size:]
+
+    tree = CountingAVL()
+    start = time.perf_counter()
+    for value in tree_values:
+        tree.add(value)
+    print('built a tree of {} values with height {} in {:.1f}s'.format(
+        args.size, tree.root.height, time.perf_counter() - start))
+
+    removals = rng.sample(tree_values, args.operations)
+
+    print('{:8} {:>8} {:>8} {:>8} {:>8} {:>9} {:>8}'.format(
+        'op', 'calls', 'search', 'retrace', 'total', 'earlier', 'seconds'))
+    for result in (_measure(tree, 'add', new_values),
+                   _measure(tree, 'remove', removals)):
+        print('{:8} {:8} {:8.2f} {:8.2f} {:8.2f} {:9.2f} {:8.2f}'.format(
+            result['operation'], result['calls'], result['search_visits'],
+            result['retrace_visits'], result['total_visits'],
+            result['earlier_total_visits'], result['seconds']))
+
+    if not tree.is_valid_avl():
+        print('tree is not a valid AVL tree')
+        return 1
+    return 0
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Bloom Filter
+# Description: Defines Bloom filters for approximate membership tests, used by
+#              HashMap.enable_filter() to reject most absent keys before the
+#              hash map's own hash function is called or a chain is walked. A
+#              filter answers "definitely not present" or "possibly present",
+#              with a false positive rate set by its number of bits per key.
+#              Each key's bit positions come from its built-in hash, which is
+#              computed in C and cached for str keys, split into two halves
+#              for double hashing. The counting variant keeps a small counter
+#              per position instead of a bit, so keys can also be removed.
+
+
+import math
+
+
+_MASK_64 = 0xffffffffffffffff
+_MASK_32 = 0xffffffff
+
+# Odd 64-bit multiplier that scrambles a key's built-in hash
+_MULTIPLIER = 0x9e3779b97f4a7c15
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01,
+                 max_bytes: int = None) -> None:
+        """
+        Init new BloomFilter sized to hold the specified number of keys with
+        at most the specified false positive rate.
+
+        If max_bytes is given and the filter would need more memory than that,
+        it is made smaller and its false positive rate is higher.
+        """
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+
+        # Optimal number of positions for the rate: -n ln(p) / ln(2)^2
+        positions = math.ceil(-capacity * math.log(false_positive_rate) /
+                              math.log(2) ** 2)
+        if max_bytes is not None:
+            positions = min(positions, max_bytes * self._positions_per_byte())
+        self.position_count = max(positions, 8)
+
+        # Optimal number of positions set per key for that many positions
+        self.hash_count = max(1, round(self.position_count / capacity *
+                                       math.log(2)))
+
+        # Number of keys added, including any later removed
+        self.count = 0
+        self._table = bytearray(self._table_bytes())
+
+    def _positions_per_byte(self) -> int:
+        """
+        Used internally to get the number of positions stored in each byte.
+        """
+        return 8
+
+    def _table_bytes(self) -> int:
+        """
+        Used internally to get the size of the table in bytes.
+        """
+        return (self.position_count + 7) // 8
+
+    def __str__(self) -> str:
+        """
+        Return the filter's size and settings in human-readable form
+        """
+        return 'FILTER ' + str(self.count) + ' / ' + str(self.capacity) + \
+            ' keys, ' + str(len(self._table)) + ' bytes, ' + \
+            str(self.hash_count) + ' hashes'
+
+    def _positions(self, key) -> list:
+        """
+        Used internally to find the positions of a key by double hashing: the
+        two halves of the key's scrambled built-in hash give the first
+        position and the step between positions.
+        """
+        code = (hash(key) * _MULTIPLIER) & _MASK_64
+        code ^= code >> 29
+        count = self.position_count
+        position = (code & _MASK_32) % count
+        step = ((code >> 32) | 1) % count or 1
+        positions = []
+        for _ in range(self.hash_count):
+            positions.append(position)
+            position += step
+            if position >= count:
+                position -= count
+        return positions
+
+    def add(self, key) -> None:
+        """
+        Adds a key to the filter.
+        """
+        table = self._table
+        for position in self._positions(key):
+            table[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key) -> bool:
+        """
+        Returns False if the key was definitely never added to the filter.
+        Otherwise, returns True.
+        """
+        # Repeats the work of _positions() inline, stopping at the first
+        # unset bit, since most lookups are for absent keys
+        code = (hash(key) * _MULTIPLIER) & _MASK_64
+        code ^= code >> 29
+        count = self.position_count
+        position = (code & _MASK_32) % count
+        step = ((code >> 32) | 1) % count or 1
+        table = self._table
+        for _ in range(self.hash_count):
+            if not table[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+            if position >= count:
+                position -= count
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes every key from the filter.
+        """
+        self._table = bytearray(len(self._table))
+        self.count = 0
+
+    def memory_bytes(self) -> int:
+        """
+        Returns the size of the filter's table in bytes.
+        """
+        return len(self._table)
+
+
+class CountingBloomFilter(BloomFilter):
+    """
+    Bloom filter keeping a one-byte counter per position instead of a bit,
+    so keys can be removed again. A counter that reaches 255 stays there,
+    since it no longer knows how many keys share it.
+    """
+
+    def _positions_per_byte(self) -> int:
+        """
+        Used internally to get the number of positions stored in each byte.
+        """
+        return 1
+
+    def _table_bytes(self) -> int:
+        """
+        Used internally to get the size of the table in bytes.
+        """
+        return self.position_count
+
+    def add(self, key) -> None:
+        """
+        Adds a key to the filter.
+        """
+        table = self._table
+        for position in self._positions(key):
+            if table[position] < 255:
+                table[position] += 1
+        self.count += 1
+
+    def __contains__(self, key) -> bool:
+        """
+        Returns False if the key is definitely not in the filter.
+        Otherwise, returns True.
+        """
+        code = (hash(key) * _MULTIPLIER) & _MASK_64
+        code ^= code >> 29
+        count = self.position_count
+        position = (code & _MASK_32) % count
+        step = ((code >> 32) | 1) % count or 1
+        table = self._table
+        for _ in range(self.hash_count):
+            if not table[position]:
+                return False
+            position += step
+            if position >= count:
+                position -= count
+        return True
+
+    def remove(self, key) -> None:
+        """
+        Removes a key that was added to the filter. Removing a key that was
+        never added can make the filter reject keys that were.
+        """
+        table = self._table
+        for position in self._positions(key):
+            if 0 < table[position] < 255:
+                table[position] -= 1
+        self.count -= 1
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    import time
+
+    from hash_functions import fnv1a
+    from hash_map import HashMap
+
+    print("\nfalse positive rate example")
+    print("---------------------------")
+    for max_bytes in (None, 4000):
+        f = BloomFilter(10000, 0.01, max_bytes)
+        for i in range(10000):
+            f.add('key' + str(i))
+        false_positives = sum(('miss' + str(i)) in f for i in range(100000))
+        print(f, ' false positive rate', false_positives / 100000)
+
+    print("\ncounting filter example")
+    print("-----------------------")
+    f = CountingBloomFilter(100)
+    for key in ('a', 'b', 'c'):
+        f.add(key)
+    f.remove('b')
+    print(f, 'a' in f, 'b' in f)
+
+    print("\nHashMap misses with and without a filter (fnv1a, 20000 keys)")
+    print("------------------------------------------------------------")
+    m = HashMap(1024, fnv1a)
+    for i in range(20000):
+        m.put('some/longer/path/key' + str(i), i)
+    misses = ['some/longer/path/miss' + str(i) for i in range(20000)]
+    for label in ('no filter', 'filter'):
+        if label == 'filter':
+            m.enable_filter(0.01)
+        start = time.perf_counter()
+        for key in misses:
+            m.get(key)
+        print('{:10} {:.3f}s'.format(label, time.perf_counter() - start))
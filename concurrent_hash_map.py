@@ -0,0 +1,432 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Concurrent Hash Map
+# Description: Defines a thread-safe separate chaining Hash Map ADT that uses
+#              lock striping: the buckets are split into a fixed number of
+#              stripes and each stripe has its own lock, so writers to
+#              different stripes never wait on each other. Readers take no
+#              lock at all; each stripe has a version counter (a sequence
+#              lock) and a read is retried, and finally done under the lock,
+#              only if a writer changed the stripe while the read ran.
+#              Resizing takes every stripe lock in order and swaps in a new
+#              table of freshly built chains, so readers still walking the
+#              old table always see complete chains.
+
+
+import threading
+import time
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+
+class _Node:
+    """
+    Chain link of a ConcurrentHashMap bucket
+    """
+    __slots__ = ('key', 'value', 'key_hash', 'next')
+
+    def __init__(self, key, value, key_hash, next_node) -> None:
+        self.key = key
+        self.value = value
+        self.key_hash = key_hash
+        self.next = next_node
+
+
+class _Table:
+    """
+    Bucket array of a ConcurrentHashMap. Replaced as a whole on resize so
+    readers can grab the current one with a single reference read.
+    """
+    __slots__ = ('buckets', 'capacity')
+
+    def __init__(self, capacity: int) -> None:
+        self.buckets = [None] * capacity
+        self.capacity = capacity
+
+
+class ConcurrentHashMap:
+    # Load factor above which put() doubles the capacity of the hash map
+    max_load_factor = 1.0
+    # Optimistic attempts a read makes before falling back to the lock
+    read_retries = 2
+
+    def __init__(self, capacity: int, function, stripes: int = 16) -> None:
+        """
+        Init new ConcurrentHashMap with the specified number of lock stripes.
+
+        The capacity is rounded up to a multiple of the stripe count, which
+        keeps every key in the same stripe across resizes.
+        """
+        self.hash_function = function
+        self._stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        # Odd while a writer is changing the stripe
+        self._versions = [0] * stripes
+        # Number of keys held in each stripe
+        self._counts = [0] * stripes
+
+        capacity = max(capacity, stripes)
+        capacity += -capacity % stripes
+        self._table = _Table(capacity)
+
+    def __str__(self) -> str:
+        """
+        Return content of hash map in human-readable form
+        """
+        table = self._table
+        out = ''
+        for i in range(table.capacity):
+            pairs = []
+            node = table.buckets[i]
+            while node is not None:
+                pairs.append('(' + str(node.key) + ': ' + str(node.value) +
+                             ')')
+                node = node.next
+            out += str(i) + ': SLL [' + ' -> '.join(pairs) + ']\n'
+        return out
+
+    @property
+    def size(self) -> int:
+        """
+        Number of key/value pairs in the hash map.
+        """
+        return sum(self._counts)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Number of buckets in the hash map.
+        """
+        return self._table.capacity
+
+    def _find_node(self, table: _Table, key, key_hash: int):
+        """
+        Used internally to find the node holding a key in a table.
+
+        Returns the node if the key is found.
+        Otherwise, returns None.
+        """
+        node = table.buckets[key_hash % table.capacity]
+        while node is not None:
+            if node.key_hash == key_hash and node.key == key:
+                return node
+            node = node.next
+        return None
+
+    def _read(self, key):
+        """
+        Used internally to look a key up without blocking writers.
+
+        Returns a tuple of whether the key was found and its value.
+        """
+        key_hash = self.hash_function(key)
+        stripe = key_hash % self._stripes
+        versions = self._versions
+
+        # Optimistic reads: succeed if no writer touched the stripe (and no
+        # resize swapped the table) between the two version checks
+        for _ in range(self.read_retries):
+            version = versions[stripe]
+            if version % 2 == 0:
+                table = self._table
+                node = self._find_node(table, key, key_hash)
+                found = (node is not None, None if node is None else
+                         node.value)
+                if versions[stripe] == version and self._table is table:
+                    return found
+
+        # Falls back to reading under the stripe lock
+        with self._locks[stripe]:
+            node = self._find_node(self._table, key, key_hash)
+            if node is None:
+                return False, None
+            return True, node.value
+
+    def get(self, key) -> object:
+        """
+        Takes a key to search for in a hash map.
+
+        Returns the object associated with the specified key.
+
+        Otherwise, if the key is not in the hash map, returns None.
+        """
+        return self._read(key)[1]
+
+    def contains_key(self, key) -> bool:
+        """
+        Checks the hash map for a specified key.
+
+        Returns True if the key is in the hash map.
+        Otherwise, returns False.
+        """
+        return self._read(key)[0]
+
+    def put(self, key, value: object) -> None:
+        """
+        Takes a key and an object to pair with the key and puts it in a hash
+        map.
+
+        If the key is already associated with a paired object, it replaces the
+        key's current object with the new object.
+
+        Otherwise, inserts the key/object pair into the hash map.
+        """
+        key_hash = self.hash_function(key)
+        stripe = key_hash % self._stripes
+
+        with self._locks[stripe]:
+            table = self._table
+            node = self._find_node(table, key, key_hash)
+
+            # Replacing a value is a single reference write, so readers see
+            # either the old or the new value; no version bump is needed
+            if node is not None:
+                node.value = value
+                return
+
+            self._versions[stripe] += 1
+            index = key_hash % table.capacity
+            table.buckets[index] = _Node(key, value, key_hash,
+                                         table.buckets[index])
+            self._counts[stripe] += 1
+            self._versions[stripe] += 1
+
+            # Every stripe holds the same share of the buckets, so checking
+            # this stripe's load avoids summing the counts on every put
+            grow = self._counts[stripe] > \
+                table.capacity // self._stripes * self.max_load_factor
+
+        # Resizing takes every stripe lock, so it must happen after this
+        # stripe's lock is released
+        if grow:
+            self.resize_table(table.capacity * 2, table)
+
+    def remove(self, key) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+
+        If the specified key is not in the hash map, this does nothing.
+        """
+        key_hash = self.hash_function(key)
+        stripe = key_hash % self._stripes
+
+        with self._locks[stripe]:
+            table = self._table
+            index = key_hash % table.capacity
+            previous = None
+            node = table.buckets[index]
+
+            while node is not None:
+                if node.key_hash == key_hash and node.key == key:
+                    # Unlinking leaves the removed node pointing at the rest
+                    # of the chain, so readers standing on it can go on
+                    self._versions[stripe] += 1
+                    if previous is None:
+                        table.buckets[index] = node.next
+                    else:
+                        previous.next = node.next
+                    self._counts[stripe] -= 1
+                    self._versions[stripe] += 1
+                    return
+                previous = node
+                node = node.next
+
+    def _lock_all(self) -> None:
+        """
+        Used internally to acquire every stripe lock, always in stripe order
+        so two threads doing this can never deadlock.
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Used internally to release every stripe lock.
+        """
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of a hash map.
+
+        Does not change capacity.
+        """
+        self._lock_all()
+        try:
+            self._table = _Table(self._table.capacity)
+            self._counts = [0] * self._stripes
+        finally:
+            self._unlock_all()
+
+    def resize_table(self, new_capacity: int, expected=None) -> None:
+        """
+        Resizes a hash table to a new specified capacity, rounded up to a
+        multiple of the stripe count.
+
+        If the specified capacity is less than 1, does nothing.
+
+        Otherwise, builds new chains in a new table using the cached hashes
+        and swaps it in while holding every stripe lock. If expected is given
+        and another thread has already replaced that table, does nothing, so
+        threads racing to grow the map only grow it once.
+        """
+        if new_capacity < 1:
+            return
+
+        new_capacity = max(new_capacity, self._stripes)
+        new_capacity += -new_capacity % self._stripes
+
+        self._lock_all()
+        try:
+            if expected is not None and self._table is not expected:
+                return
+
+            old_table = self._table
+            new_table = _Table(new_capacity)
+            new_buckets = new_table.buckets
+
+            # Copies the nodes instead of relinking them, so a reader still
+            # walking an old chain never gets moved onto a new one
+            for node in old_table.buckets:
+                while node is not None:
+                    index = node.key_hash % new_capacity
+                    new_buckets[index] = _Node(node.key, node.value,
+                                               node.key_hash,
+                                               new_buckets[index])
+                    node = node.next
+
+            self._table = new_table
+        finally:
+            self._unlock_all()
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of empty buckets in a hash map.
+
+        Returns the total count.
+        """
+        return self._table.buckets.count(None)
+
+    def table_load(self) -> float:
+        """
+        Calculates the load factor of a hash map, which is the average
+        number of elements in each bucket.
+
+        Returns the load factor of the hash map.
+        """
+        return self.size / self.capacity
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a Dynamic Array containing all keys stored in a hash map.
+
+        Keys put or removed while this runs may or may not be included.
+        """
+        key_array = DynamicArray()
+        for node in self._table.buckets:
+            while node is not None:
+                key_array.append(node.key)
+                node = node.next
+        return key_array
+
+
+def run_mixed_workload(hash_map, threads: int, operations: int,
+                       read_ratio: float, key_count: int) -> float:
+    """
+    Takes a hash map, a number of threads, the number of operations each
+    thread runs, the fraction of them that are get() calls and the number of
+    distinct keys used.
+
+    Runs the operations on a pool of threads started together and returns
+    the throughput in operations per second.
+    """
+    keys = ['key' + str(i) for i in range(key_count)]
+    for key in keys:
+        hash_map.put(key, 0)
+
+    start_gate = threading.Barrier(threads + 1)
+
+    def worker(seed):
+        # A small linear congruential generator keeps the workload identical
+        # between runs without sharing a random.Random across threads
+        state = seed
+        reads = int(read_ratio * 1000)
+        start_gate.wait()
+        for i in range(operations):
+            state = (state * 1103515245 + 12345) & 0x7fffffff
+            key = keys[state % key_count]
+            if state % 1000 < reads:
+                hash_map.get(key)
+            elif i % 2:
+                hash_map.put(key, i)
+            else:
+                hash_map.remove(key)
+
+    pool = [threading.Thread(target=worker, args=(seed,))
+            for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    start_gate.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return threads * operations / (time.perf_counter() - start)
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    from hash_functions import builtin_hash
+    from hash_map import HashMap
+
+    class SingleLockHashMap:
+        """
+        Baseline: a HashMap with every call made under one global lock
+        """
+        def __init__(self, capacity, function):
+            self._map = HashMap(capacity, function)
+            self._lock = threading.Lock()
+
+        def get(self, key):
+            with self._lock:
+                return self._map.get(key)
+
+        def put(self, key, value):
+            with self._lock:
+                self._map.put(key, value)
+
+        def remove(self, key):
+            with self._lock:
+                self._map.remove(key)
+
+    print("\nconcurrent put / get example")
+    print("----------------------------")
+    m = ConcurrentHashMap(16, builtin_hash)
+
+    def fill(start):
+        for i in range(start, start + 5000):
+            m.put('key' + str(i), i)
+
+    pool = [threading.Thread(target=fill, args=(n * 5000,))
+            for n in range(4)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    print(m.size, m.capacity, m.get('key12345'), m.contains_key('key20000'))
+
+    print("\nmixed workload benchmark (operations per second)")
+    print("------------------------------------------------")
+    for read_ratio in (0.5, 0.9, 0.99):
+        for threads in (1, 4, 8):
+            baseline = run_mixed_workload(
+                SingleLockHashMap(1024, builtin_hash), threads, 20000,
+                read_ratio, 10000)
+            striped = run_mixed_workload(
+                ConcurrentHashMap(1024, builtin_hash), threads, 20000,
+                read_ratio, 10000)
+            print('reads {:4.0%}  threads {}  single lock {:9.0f}  '
+                  'striped {:9.0f}'.format(read_ratio, threads, baseline,
+                                           striped))
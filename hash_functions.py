@@ -0,0 +1,286 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Hash Function Library
+# Description: Defines a selection of hash functions that can be passed to
+#              HashMap(capacity, function) in place of hash_function_1 and
+#              hash_function_2, batch variants that hash many keys in one
+#              call, and a collision report for comparing how evenly each
+#              function spreads a set of keys over a table's buckets.
+#              hash_generic accepts keys of any hashable type, so they never
+#              need to be converted to strings first, and scrambles their
+#              built-in hash so that keys that compare equal (such as 1, 1.0
+#              and True) always share a hash. stable_hash gives int, str,
+#              bytes and tuple keys a hash that is the same in every process.
+
+
+import time
+
+from hash_map import hash_function_1, hash_function_2
+
+
+# 64-bit FNV-1a parameters
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK_64 = 0xffffffffffffffff
+
+# Default 128-bit SipHash key, split into two 64-bit halves
+_SIP_K0 = 0x0706050403020100
+_SIP_K1 = 0x0f0e0d0c0b0a0908
+
+
+def _to_bytes(key) -> bytes:
+    """
+    Used internally to get the bytes to hash for a str or bytes key.
+    """
+    if type(key) is bytes:
+        return key
+    return key.encode('utf-8')
+
+
+def fnv1a(key: str) -> int:
+    """
+    64-bit FNV-1a hash of a str (hashed as UTF-8) or bytes key.
+
+    Mixes every byte into the hash, so unlike hash_function_1 anagrams do not
+    collide, and the result is the same in every process.
+    """
+    hash = _FNV_OFFSET
+    for byte in _to_bytes(key):
+        hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+    return hash
+
+
+def _rotl(value: int, bits: int) -> int:
+    """
+    Used internally to rotate a 64-bit value left by the specified bits.
+    """
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def siphash24(key: str, k0: int = _SIP_K0, k1: int = _SIP_K1) -> int:
+    """
+    SipHash-2-4 of a str (hashed as UTF-8) or bytes key under the 128-bit
+    secret (k0, k1).
+
+    Much slower than fnv1a in pure Python, but keys chosen by an attacker
+    cannot be made to collide without knowing the secret.
+    """
+    data = _to_bytes(key)
+    length = len(data)
+
+    v0 = k0 ^ 0x736f6d6570736575
+    v1 = k1 ^ 0x646f72616e646f6d
+    v2 = k0 ^ 0x6c7967656e657261
+    v3 = k1 ^ 0x7465646279746573
+
+    def sip_round(v0, v1, v2, v3):
+        v0 = (v0 + v1) & _MASK_64
+        v1 = _rotl(v1, 13) ^ v0
+        v0 = _rotl(v0, 32)
+        v2 = (v2 + v3) & _MASK_64
+        v3 = _rotl(v3, 16) ^ v2
+        v0 = (v0 + v3) & _MASK_64
+        v3 = _rotl(v3, 21) ^ v0
+        v2 = (v2 + v1) & _MASK_64
+        v1 = _rotl(v1, 17) ^ v2
+        v2 = _rotl(v2, 32)
+        return v0, v1, v2, v3
+
+    # Compresses every full 8-byte little-endian word of the key
+    full = length - length % 8
+    for i in range(0, full, 8):
+        word = int.from_bytes(data[i:i + 8], 'little')
+        v3 ^= word
+        v0, v1, v2, v3 = sip_round(v0, v1, v2, v3)
+        v0, v1, v2, v3 = sip_round(v0, v1, v2, v3)
+        v0 ^= word
+
+    # The last word holds the leftover bytes and the key length
+    word = int.from_bytes(data[full:], 'little') | ((length & 0xff) << 56)
+    v3 ^= word
+    v0, v1, v2, v3 = sip_round(v0, v1, v2, v3)
+    v0, v1, v2, v3 = sip_round(v0, v1, v2, v3)
+    v0 ^= word
+
+    # Finalization
+    v2 ^= 0xff
+    for _ in range(4):
+        v0, v1, v2, v3 = sip_round(v0, v1, v2, v3)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def builtin_hash(key: str) -> int:
+    """
+    Python's built-in hash of the key, made non-negative.
+
+    By far the fastest choice (str hashes are computed in C and cached on the
+    string), but str and bytes hashes change between processes unless
+    PYTHONHASHSEED is set, so it must not be used for anything persisted.
+    """
+    return hash(key) & _MASK_64
+
+
+def _mix_int(value: int) -> int:
+    """
+    Used internally to scramble the bits of an int key (the SplitMix64
+    finalizer). It is a bijection on 64-bit values, so distinct keys in that
+    range never share a hash, while strided keys such as multiples of 1024
+    still spread over every bucket.
+    """
+    value &= _MASK_64
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & _MASK_64
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & _MASK_64
+    return value ^ (value >> 31)
+
+
+def hash_generic(key) -> int:
+    """
+    Hash of any hashable key, for HashMaps whose keys are not all strings.
+
+    Scrambles the key's built-in hash (computed in C, and cached for str),
+    so strided int keys such as multiples of 1024 still spread over every
+    bucket. Built-in hashes agree whenever keys compare equal, so 1, 1.0,
+    True and Fraction(1) all find the same pair, as they do in a dict. Like
+    builtin_hash, the result for str, bytes and anything containing them
+    changes between processes.
+    """
+    return _mix_int(hash(key))
+
+
+def stable_hash(key) -> int:
+    """
+    Hash of an int, str, bytes or tuple (of those) key that is the same in
+    every process, for anything persisted or shared between processes.
+
+    Raises TypeError for any other type of key.
+    """
+    key_type = type(key)
+    if key_type is int:
+        return _mix_int(key)
+    if key_type is str or key_type is bytes:
+        # Tags str and bytes differently so 'a' and b'a' do not collide
+        return fnv1a(key) ^ (0 if key_type is str else 0x9e3779b97f4a7c15)
+    if key_type is tuple:
+        hash = _FNV_OFFSET ^ len(key)
+        for item in key:
+            hash = _mix_int((hash ^ stable_hash(item)) * _FNV_PRIME)
+        return hash
+    raise TypeError('no stable hash for ' + key_type.__name__ + ' keys')
+
+
+def hash_many(keys, function=builtin_hash) -> list:
+    """
+    Takes an iterable of keys and a hash function.
+
+    Returns a list of the keys' hashes, computed in a single call to map() to
+    avoid the per-key overhead of a Python loop.
+    """
+    # Hashing builtin_hash directly keeps the whole loop in C
+    if function is builtin_hash:
+        return [h & _MASK_64 for h in map(hash, keys)]
+    return list(map(function, keys))
+
+
+# Hash functions selectable by name, e.g. get_hash_function('fnv1a')
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': fnv1a,
+    'siphash24': siphash24,
+    'builtin': builtin_hash,
+    'generic': hash_generic,
+    'stable': stable_hash,
+}
+
+
+def get_hash_function(name: str):
+    """
+    Returns the hash function registered under the specified name.
+
+    Raises KeyError if there is no hash function with that name.
+    """
+    return HASH_FUNCTIONS[name]
+
+
+def collision_report(function, keys, capacity: int) -> dict:
+    """
+    Takes a hash function, an iterable of keys and a table capacity.
+
+    Returns a dictionary describing how the function spreads the keys over
+    that many buckets:
+        keys, capacity      -- the number of keys and buckets
+        seconds             -- time spent hashing every key once
+        hash_collisions     -- keys whose full hash equals another key's
+        used_buckets        -- buckets holding at least one key
+        expected_used       -- used buckets expected from a random function
+        empty_buckets       -- buckets holding no key
+        max_chain           -- length of the longest chain
+        average_chain       -- average chain length over used buckets
+    """
+    keys = list(keys)
+
+    start = time.perf_counter()
+    hashes = hash_many(keys, function)
+    seconds = time.perf_counter() - start
+
+    # Counts how many keys land in each bucket
+    chains = [0] * capacity
+    for key_hash in hashes:
+        chains[key_hash % capacity] += 1
+
+    used = capacity - chains.count(0)
+    count = len(keys)
+
+    return {
+        'keys': count,
+        'capacity': capacity,
+        'seconds': seconds,
+        'hash_collisions': count - len(set(hashes)),
+        'used_buckets': used,
+        'expected_used': capacity * (1 - (1 - 1 / capacity) ** count),
+        'empty_buckets': capacity - used,
+        'max_chain': max(chains) if count else 0,
+        'average_chain': count / used if used else 0.0,
+    }
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    print("\ncollision report example")
+    print("------------------------")
+    keys = ['key' + str(i) for i in range(20000)]
+    keys += [''.join(reversed(key)) for key in keys[:2000]]
+    for name, function in HASH_FUNCTIONS.items():
+        report = collision_report(function, keys, 10007)
+        print('{:16} {:8.4f}s  hash collisions {:6}  used {:5} / {:7.0f}  '
+              'max chain {:3}'.format(name, report['seconds'],
+                                      report['hash_collisions'],
+                                      report['used_buckets'],
+                                      report['expected_used'],
+                                      report['max_chain']))
+
+    print("\nnon-string keys example")
+    print("-----------------------")
+    from dataclasses import dataclass
+    from hash_map import HashMap
+
+    @dataclass(frozen=True)
+    class Point:
+        x: int
+        y: int
+
+    m = HashMap(10, hash_generic)
+    for key in (42, b'raw bytes', ('tuple', 1), Point(1, 2), 'text'):
+        m.put(key, repr(key))
+    print(m.size, m.get(42), m.get(Point(1, 2)), m.get(('tuple', 1)),
+          m.contains_key(43))
+    print(collision_report(hash_generic, range(0, 1 << 20, 1024), 1024)
+          ['max_chain'],
+          collision_report(builtin_hash, range(0, 1 << 20, 1024), 1024)
+          ['max_chain'])
+
+    print("\nSipHash-2-4 reference vector")
+    print("----------------------------")
+    # Expected value from the SipHash paper: key 00..0f, message 00..0e
+    print(hex(siphash24(bytes(range(15)))) == '0xa129ca6149be45e5')
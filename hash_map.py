@@ -8,12 +8,43 @@
 #              the hash map contains a key, to find the number of empty buckets
 #              in the hash map and the map's load factor, to resize the hash
 #              map to a specified capacity, and to get an array of all the keys
-#              contained in the hash map.
-
+#              contained in the hash map. The hash map grows (and optionally
+#              shrinks) itself geometrically to keep its load factor bounded,
+#              optionally migrating buckets incrementally across operations.
+#              Every link caches its key's full hash, so resizing never calls
+#              the hash function again and chain walks compare hashes before
+#              comparing keys. Batch methods put, get, remove and check many
+#              keys in one call, resizing at most once, and generators stream
+#              the keys, values or pairs without copying them. Optional
+#              instrumentation records probe counts, resizes and hashing time.
+#              The number of occupied buckets is kept up to date as links
+#              come and go, so empty_buckets() runs in O(1). Keys may be any
+#              hashable object the hash function accepts (hash_function_1 and
+#              hash_function_2 only take str; see hash_functions.hash_generic
+#              for int, bytes, tuple and other keys). freeze() turns a
+#              finished map into an immutable, minimally perfectly hashed
+#              FrozenHashMap for fast, lock-free reads. An optional Bloom
+#              filter kept in sync with the keys rejects most absent keys
+#              before they are hashed or any chain is walked.
+#              hashed_items() and from_hashed_items() stream the pairs out
+#              with their cached hashes and rebuild a map from them without
+#              hashing any key, for saving and restoring snapshots.
+
+
+import time
 
 # Import pre-written DynamicArray and LinkedList classes
 from a5_include import *
 
+from bloom_filter import BloomFilter, CountingBloomFilter
+from hash_map_frozen import FrozenHashMap
+
+
+# Shared, always empty bucket standing in for every bucket that has never
+# held a link, so a new bucket array can be made without building a linked
+# list per bucket. It is replaced by a list of its own on the first insert.
+_EMPTY_BUCKET = LinkedList()
+
 
 def hash_function_1(key: str) -> int:
     """
@@ -39,7 +70,121 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+def _to_list(items) -> list:
+    """
+    Used internally to turn an iterable or a Dynamic Array into a list.
+    """
+    if isinstance(items, DynamicArray):
+        return [items.get_at_index(i) for i in range(items.length())]
+    return list(items)
+
+
+class HashMapException(Exception):
+    """
+    Custom exception to be used by HashMap class
+    """
+    pass
+
+
+class HashMapStats:
+    """
+    Counters a HashMap records while its instrumentation is enabled.
+
+    Hooks added with add_hook() are called as hook(event, value) for every
+    'get' and 'put' (value is the number of links probed) and every 'resize'
+    (value is the seconds it took), so they can feed a metrics system.
+    """
+    def __init__(self, hash_function) -> None:
+        self.gets = 0
+        self.get_probes = 0
+        self.max_get_probes = 0
+        self.puts = 0
+        self.put_probes = 0
+        self.max_put_probes = 0
+        self.resizes = 0
+        self.resize_seconds = 0.0
+        self.hash_calls = 0
+        self.hash_seconds = 0.0
+        # The hash function the HashMap used before instrumentation wrapped it
+        self.hash_function = hash_function
+        self._hooks = []
+
+    def add_hook(self, hook) -> None:
+        """
+        Takes a function to be called as hook(event, value) on every event.
+        """
+        self._hooks.append(hook)
+
+    def timed_hash(self, key) -> int:
+        """
+        Calls the original hash function, timing the call.
+        """
+        start = time.perf_counter()
+        key_hash = self.hash_function(key)
+        self.hash_seconds += time.perf_counter() - start
+        self.hash_calls += 1
+        return key_hash
+
+    def record_probes(self, operation: str, probes: int) -> None:
+        """
+        Records the number of links probed by a 'get' or 'put' operation.
+        """
+        if operation == 'put':
+            self.puts += 1
+            self.put_probes += probes
+            if probes > self.max_put_probes:
+                self.max_put_probes = probes
+        else:
+            self.gets += 1
+            self.get_probes += probes
+            if probes > self.max_get_probes:
+                self.max_get_probes = probes
+        for hook in self._hooks:
+            hook(operation, probes)
+
+    def record_resize(self, seconds: float, finished: bool) -> None:
+        """
+        Records time spent resizing. finished is True when the time closes a
+        resize (or a step of an incremental one that completed it).
+        """
+        self.resize_seconds += seconds
+        if finished:
+            self.resizes += 1
+        for hook in self._hooks:
+            hook('resize', seconds)
+
+
 class HashMap:
+    # Load factor above which put() doubles the capacity of the hash map
+    max_load_factor = 1.0
+    # Load factor below which remove() halves the capacity of the hash map
+    # (0 disables shrinking)
+    min_load_factor = 0.0
+    # Number of old buckets each get/put/remove/contains_key migrates while an
+    # incremental resize is in progress (0 resizes the whole table at once)
+    rehash_step = 0
+
+    # Old bucket array and capacity kept while an incremental resize is in
+    # progress, and the index of the next old bucket to migrate
+    _old_buckets = None
+    _old_capacity = 0
+    _rehash_index = 0
+
+    # Counts changes to which keys are stored or where, so iterators can
+    # detect the hash map being modified while they run
+    _mod_count = 0
+
+    # Instrumentation counters, or None while instrumentation is disabled
+    _stats = None
+
+    # Number of buckets in the hash map's array holding at least one link
+    _occupied = 0
+
+    # Bloom filter holding every key, or None while filtering is disabled,
+    # and the (false positive rate, max bytes, counting) it was enabled with
+    _filter = None
+    _filter_settings = None
+
     def __init__(self, capacity: int, function) -> None:
         """
         Init new HashMap based on DA with SLL for collision resolution
@@ -69,14 +214,325 @@ class HashMap:
 
         Does not change capacity.
         """
-        # Iterates through the capacity of the hash map's array and replaces
-        # the lists at each position in the array with a new empty linked list
-        for i in range(self.capacity):
-            self.buckets.set_at_index(i, LinkedList())
+        # Abandons any incremental resize in progress along with its contents
+        self._old_buckets = None
+
+        # Replaces the hash map's array with one whose every bucket is empty
+        self.buckets = self._new_buckets(self.capacity)
         # Resets size of the hash map
         self.size = 0
+        self._occupied = 0
+        self._mod_count += 1
+
+        if self._filter is not None:
+            self._filter.clear()
+
+    def set_load_factors(self, max_load: float, min_load: float = 0.0) -> None:
+        """
+        Takes the maximum load factor allowed before put() grows the hash map
+        and the minimum load factor allowed before remove() shrinks it.
+
+        A minimum load factor of 0 disables shrinking. The minimum must be
+        less than half of the maximum so that halving the capacity never
+        pushes the load factor back over the maximum.
+        """
+        # The maximum load factor has to leave room for at least one element
+        if max_load <= 0:
+            raise HashMapException
+
+        # Shrinking right after growing (or vice versa) would thrash the table
+        if min_load < 0 or min_load >= max_load / 2:
+            raise HashMapException
+
+        self.max_load_factor = max_load
+        self.min_load_factor = min_load
+
+    def enable_stats(self) -> HashMapStats:
+        """
+        Turns on instrumentation, which records probe counts for every
+        lookup, resize count and time, and hashing time.
+
+        Returns the HashMapStats object holding the counters. While
+        instrumentation is disabled the only cost is one attribute check per
+        lookup.
+        """
+        if self._stats is None:
+            self._stats = HashMapStats(self.hash_function)
+            # Times every hash call by routing it through the stats object
+            self.hash_function = self._stats.timed_hash
+        return self._stats
 
-    def get(self, key: str) -> object:
+    def disable_stats(self) -> None:
+        """
+        Turns off instrumentation and restores the original hash function.
+        """
+        if self._stats is not None:
+            self.hash_function = self._stats.hash_function
+            self._stats = None
+
+    def stats_snapshot(self) -> dict:
+        """
+        Returns a dictionary describing the hash map's current shape and,
+        while instrumentation is enabled, its recorded counters.
+
+        The chain length histogram maps each chain length to the number of
+        buckets with a chain that long.
+        """
+        histogram = {}
+        for i in range(self.capacity):
+            length = 0
+            cur_link = self.buckets.get_at_index(i).head
+            while cur_link is not None:
+                length += 1
+                cur_link = cur_link.next
+            histogram[length] = histogram.get(length, 0) + 1
+
+        snapshot = {
+            'size': self.size,
+            'capacity': self.capacity,
+            'load': self.size / self.capacity if self.capacity else 0.0,
+            'empty_buckets': self.capacity - self._occupied,
+            'chain_lengths': histogram,
+            'enabled': self._stats is not None,
+        }
+
+        stats = self._stats
+        if stats is not None:
+            snapshot.update({
+                'gets': stats.gets,
+                'average_get_probes':
+                    stats.get_probes / stats.gets if stats.gets else 0.0,
+                'max_get_probes': stats.max_get_probes,
+                'puts': stats.puts,
+                'average_put_probes':
+                    stats.put_probes / stats.puts if stats.puts else 0.0,
+                'max_put_probes': stats.max_put_probes,
+                'resizes': stats.resizes,
+                'resize_seconds': stats.resize_seconds,
+                'hash_calls': stats.hash_calls,
+                'hash_seconds': stats.hash_seconds,
+            })
+
+        return snapshot
+
+    def enable_filter(self, false_positive_rate: float = 0.01,
+                      max_bytes: int = None,
+                      counting: bool = False) -> BloomFilter:
+        """
+        Turns on a Bloom filter holding every key, which get(),
+        contains_key(), get_many() and contains_many() check first, so keys
+        the filter rules out are never hashed and no chain is walked for
+        them.
+
+        The filter is sized for the given false positive rate (the fraction
+        of absent keys it lets through) within max_bytes, if given; a budget
+        too small for the rate raises the rate instead. A plain filter cannot
+        forget removed keys, which only make it less selective; it is rebuilt
+        from the current keys whenever more keys have been added to it than
+        it was sized for. A counting filter uses 8 times the memory but drops
+        keys as they are removed.
+
+        Returns the filter.
+        """
+        if not 0 < false_positive_rate < 1:
+            raise HashMapException
+        if max_bytes is not None and max_bytes < 1:
+            raise HashMapException
+
+        self._filter_settings = (false_positive_rate, max_bytes, counting)
+        self._rebuild_filter()
+        return self._filter
+
+    def disable_filter(self) -> None:
+        """
+        Turns off the Bloom filter and frees its memory.
+        """
+        self._filter = None
+
+    def _rebuild_filter(self) -> None:
+        """
+        Used internally to replace the Bloom filter with one sized for twice
+        the current number of keys, holding exactly the current keys.
+        """
+        false_positive_rate, max_bytes, counting = self._filter_settings
+        filter_class = CountingBloomFilter if counting else BloomFilter
+        new_filter = filter_class(max(2 * self.size, 64), false_positive_rate,
+                                  max_bytes)
+
+        # Adds the keys still waiting in old buckets during an incremental
+        # resize as well; migrated old buckets are already empty
+        arrays = [(self.buckets, self.capacity)]
+        if self._old_buckets is not None:
+            arrays.append((self._old_buckets, self._old_capacity))
+        for buckets, capacity in arrays:
+            for i in range(capacity):
+                cur_link = buckets.get_at_index(i).head
+                while cur_link is not None:
+                    new_filter.add(cur_link.key)
+                    cur_link = cur_link.next
+
+        self._filter = new_filter
+
+    def _hash_candidates(self, keys: list) -> list:
+        """
+        Used internally to hash the keys of a batch lookup.
+
+        Returns a list of the keys' hashes, with None in place of the hash
+        of every key the Bloom filter rules out, which is never hashed.
+        """
+        if self._filter is None:
+            return list(map(self.hash_function, keys))
+        bloom_filter = self._filter
+        hash_function = self.hash_function
+        return [hash_function(key) if key in bloom_filter else None
+                for key in keys]
+
+    def _find_link_counted(self, key: object, key_hash: int,
+                           operation: str):
+        """
+        Used internally in place of _find_link() while instrumentation is
+        enabled. Does the same search, counting the links probed.
+        """
+        probes = 0
+        found = None
+
+        if self._old_buckets is not None:
+            old_index = key_hash % self._old_capacity
+            if old_index >= self._rehash_index:
+                check_link = self._old_buckets.get_at_index(old_index).head
+                while check_link is not None:
+                    probes += 1
+                    if check_link.key_hash == key_hash and \
+                            check_link.key == key:
+                        found = check_link
+                        break
+                    check_link = check_link.next
+
+        if found is None:
+            check_link = self.buckets.get_at_index(
+                key_hash % self.capacity).head
+            while check_link is not None:
+                probes += 1
+                if check_link.key_hash == key_hash and check_link.key == key:
+                    found = check_link
+                    break
+                check_link = check_link.next
+
+        self._stats.record_probes(operation, probes)
+        return found
+
+    def _find_link(self, key: object, key_hash: int,
+                   operation: str = 'get'):
+        """
+        Used internally to find the link holding a key, given the key's hash.
+        The operation ('get' or 'put') is only used by instrumentation.
+
+        While an incremental resize is in progress, checks the key's old
+        bucket if it has not been migrated yet, then its new bucket.
+
+        Returns the link if the key is found.
+        Otherwise, returns None.
+        """
+        if self._stats is not None:
+            return self._find_link_counted(key, key_hash, operation)
+
+        # If the key's old bucket has not been migrated yet, the key can only
+        # be there if it was stored before the resize started
+        if self._old_buckets is not None:
+            old_index = key_hash % self._old_capacity
+            if old_index >= self._rehash_index:
+                check_link = self._old_buckets.get_at_index(old_index).head
+                # Iterates down the old bucket's linked list
+                while check_link is not None:
+                    if check_link.key_hash == key_hash and \
+                            check_link.key == key:
+                        return check_link
+                    check_link = check_link.next
+
+        # Keeps track of the current link in the key's bucket
+        check_link = self.buckets.get_at_index(key_hash % self.capacity).head
+        # Iterates down the linked list
+        while check_link is not None:
+            # If the current link's key is the same as the target. Compares
+            # the cached hashes first so most mismatches skip the key compare.
+            if check_link.key_hash == key_hash and check_link.key == key:
+                return check_link
+            # Moves pointer down the linked list
+            check_link = check_link.next
+
+        # Only executes if the key was not found in the hash map
+        return None
+
+    def _put_hashed(self, key: object, value: object, key_hash: int) -> None:
+        """
+        Used internally to put a key/value pair into the hash map, given the
+        key's hash.
+
+        Does not grow the hash map; callers check the load factor.
+        """
+        # If the key is already in the hash map, replaces the key's old value
+        # with the new value
+        found = self._find_link(key, key_hash, 'put')
+        if found is not None:
+            found.value = value
+            return
+
+        # Otherwise, inserts the new key/value pair at the front of its
+        # bucket's linked list and increments the hash map's size. New pairs
+        # always go into the current (new) bucket array.
+        if self._insert_link(self.buckets, key_hash % self.capacity,
+                             key, value, key_hash):
+            self._occupied += 1
+        self.size += 1
+        self._mod_count += 1
+
+        # Adds the new key to the Bloom filter, rebuilding it once it holds
+        # more keys than it was sized for
+        if self._filter is not None:
+            self._filter.add(key)
+            if self._filter.count > self._filter.capacity:
+                self._rebuild_filter()
+
+    def _remove_hashed(self, key: object, key_hash: int) -> bool:
+        """
+        Used internally to remove a key and its value from the hash map, given
+        the key's hash.
+
+        Does not shrink the hash map; callers check the load factor.
+
+        Returns True if the key was removed.
+        Otherwise, returns False.
+        """
+        removal = False
+
+        # If the key's old bucket has not been migrated yet, tries to remove
+        # the key from there first
+        if self._old_buckets is not None:
+            old_index = key_hash % self._old_capacity
+            if old_index >= self._rehash_index:
+                removal = self._old_buckets.get_at_index(old_index).remove(key)
+
+        # Otherwise, calls the linked list's remove method on the key's
+        # bucket, which either does nothing or removes the link containing the
+        # key/value pair
+        if removal is False:
+            check_bucket = self.buckets.get_at_index(key_hash % self.capacity)
+            if check_bucket.head is not None:
+                removal = check_bucket.remove(key)
+                # Removing the only link of a bucket empties it
+                if removal is True and check_bucket.head is None:
+                    self._occupied -= 1
+
+        # If a link was removed, decrements the size of the hash map
+        if removal is True:
+            self.size -= 1
+            self._mod_count += 1
+            if type(self._filter) is CountingBloomFilter:
+                self._filter.remove(key)
+
+        return removal
+
+    def get(self, key: object) -> object:
         """
         Takes a key to search for in a hash map.
 
@@ -84,41 +540,29 @@ class HashMap:
 
         Otherwise, if the key is not in the hash map, returns None.
         """
+        # Moves a few more buckets along if an incremental resize is running
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step)
+
         # If the hash map is empty
         if self.size == 0:
             return None
 
-        # Finds and holds the index to be checked
-        check_index = self.hash_function(key) % self.capacity
-        # Finds the bucket to be checked
-        check_bucket = self.buckets.get_at_index(check_index)
-
-        # If the bucket is empty, there is no value to return
-        if check_bucket.head is None:
+        # If the Bloom filter rules the key out, it is not in the hash map
+        if self._filter is not None and key not in self._filter:
             return None
 
-        # Else, if the key of the head of the bucket is the same as the target
-        elif check_bucket.head.key == key:
-            # Returns the associated object of the key
-            return check_bucket.head.value
+        # Finds the link holding the key, if there is one
+        found = self._find_link(key, self.hash_function(key))
 
-        # Otherwise
-        else:
-            # Keeps track of the current link in the linked list
-            check_link = check_bucket.head
-            # Iterates down the linked list
-            while check_link is not None:
-                # If the current link's key is the same as the target
-                if check_link.key == key:
-                    # Returns the associated object of the key
-                    return check_link.value
-                # Moves pointer down the linked list
-                check_link = check_link.next
-
-            # Only executes if the key was not found in the hash map
+        # If the key is not in the hash map, there is no value to return
+        if found is None:
             return None
 
-    def put(self, key: str, value: object) -> None:
+        # Returns the associated object of the key
+        return found.value
+
+    def put(self, key: object, value: object) -> None:
         """
         Takes a key and an object to pair with the key and puts it in a hash
         map.
@@ -133,129 +577,198 @@ class HashMap:
         if self.capacity == 0:
             self.resize_table(1)
 
-        # Finds an index using the remainder of the hashed key divided by the
-        # hash map's capacity
-        new_index = self.hash_function(key) % self.capacity
-        # Finds and hold the correct bucket in the hash map
-        put_in_bucket = self.buckets.get_at_index(new_index)
+        # Moves a few more buckets along if an incremental resize is running
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step)
 
-        # If the bucket's linked list is empty, inserts the key/value pair
-        # into the bucket's list and increments the hash map's size
-        if put_in_bucket.head is None:
-            put_in_bucket.insert(key, value)
-            self.size += 1
+        # Inserts or updates the pair using a single hash of the key
+        self._put_hashed(key, value, self.hash_function(key))
 
-        # Else, if the bucket's head link has the same key as the new key/value
-        # pair, replaces the key's old value with the new value
-        elif put_in_bucket.head.key == key:
-            put_in_bucket.head.value = value
+        # If the new pair pushed the load factor past the maximum, doubles the
+        # capacity so the chains stay short and put() stays amortized O(1)
+        if self.size > self.capacity * self.max_load_factor:
+            self.resize_table(self.capacity * 2)
 
-        # Otherwise
-        else:
-            # Keeps track of the current link
-            chain_link = put_in_bucket.head
-            # Iterates down the linked list
-            while chain_link is not None:
-                # If one of the links down the chain has the same key as the
-                # new key/value pair, replaces the key's old value with the
-                # new value and breaks out of the main function
-                if chain_link.key == key:
-                    chain_link.value = value
-                    return
-                # Moves the pointer down the linked list
-                chain_link = chain_link.next
-
-            # Only executes if a link with the same key was not found
-            # Inserts the new key/value pair at the front of the linked list
-            # and increments the hash map's size
-            put_in_bucket.insert(key, value)
-            self.size += 1
-
-    def remove(self, key: str) -> None:
+    def remove(self, key: object) -> None:
         """
         Removes the specified key and its associated value from the hash map.
 
         If the specified key is not in the hash map, this does nothing.
         """
 
+        # Moves a few more buckets along if an incremental resize is running
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step)
+
         # If the hash map is empty, does nothing
         if self.size == 0:
             return
 
-        # Finds and holds the bucket index to check
-        check_index = self.hash_function(key) % self.capacity
-        # Finds and holds the bucket's linked list to check
-        check_bucket = self.buckets.get_at_index(check_index)
+        # If a link was removed, checks whether the hash map should shrink
+        if self._remove_hashed(key, self.hash_function(key)) is True:
 
-        # If the bucket is empty, does nothing
-        if check_bucket.head is None:
-            return
-
-        # Calls the linked lists remove method that looks for the key, then
-        # either does nothing or removes the link containing the key/value pair
-        removal = check_bucket.remove(key)
-
-        # If a link was removed, decrements the size of the hash map
-        if removal is True:
-            self.size -= 1
+            # If shrinking is enabled and the load factor fell below the
+            # minimum, halves the capacity of the hash map
+            if self.capacity > 1 and \
+                    self.size < self.capacity * self.min_load_factor:
+                self.resize_table(self.capacity // 2)
 
-    def contains_key(self, key: str) -> bool:
+    def contains_key(self, key: object) -> bool:
         """
         Checks the hash map for a specified key.
 
         Returns True if the key is in the hash map.
         Otherwise, returns False.
         """
+        # Moves a few more buckets along if an incremental resize is running
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step)
+
         # If the hash map is empty
         if self.size == 0:
             return False
 
-        # Finds and holds the index to be checked
-        check_index = self.hash_function(key) % self.capacity
-        # Finds the bucket to be checked
-        check_bucket = self.buckets.get_at_index(check_index)
-
-        # If the bucket is empty
-        if check_bucket.head is None:
+        # If the Bloom filter rules the key out, it is not in the hash map
+        if self._filter is not None and key not in self._filter:
             return False
 
-        # Else, if the key of the head of the bucket is the same as the target
-        elif check_bucket.head.key == key:
-            return True
+        return self._find_link(key, self.hash_function(key)) is not None
 
-        # Otherwise
-        else:
-            # Keeps track of the current link in the linked list
-            check_link = check_bucket.head
-            # Iterates down the linked list
-            while check_link is not None:
-                # If the current link's key is the same as the target
-                if check_link.key == key:
-                    return True
-                # Moves pointer down the linked list
-                check_link = check_link.next
+    def put_many(self, keys, values) -> None:
+        """
+        Takes an iterable (or Dynamic Array) of keys and one of objects to
+        pair with them, in the same order, and puts every pair in the hash
+        map as put() would.
 
-            return False
+        Hashes all keys in one pass and grows the hash map at most once, up
+        front, to a capacity that holds every new pair.
+        """
+        keys = _to_list(keys)
+        values = _to_list(values)
+
+        # Every key needs exactly one object to pair with
+        if len(keys) != len(values):
+            raise HashMapException
+
+        # Finds the smallest doubling of the capacity that stays within the
+        # maximum load factor even if every key is new
+        needed = self.size + len(keys)
+        new_capacity = max(self.capacity, 1)
+        while needed > new_capacity * self.max_load_factor:
+            new_capacity *= 2
+        if new_capacity != self.capacity:
+            self.resize_table(new_capacity)
+
+        # Moves the incremental resize along as far as the same number of
+        # single put() calls would
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step * len(keys))
+
+        hashes = list(map(self.hash_function, keys))
+        for i in range(len(keys)):
+            self._put_hashed(keys[i], values[i], hashes[i])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Takes an iterable (or Dynamic Array) of keys to search for in the hash
+        map.
 
-    def empty_buckets(self) -> int:
+        Returns a Dynamic Array of the objects associated with the keys, in
+        the same order, with None for every key not in the hash map.
         """
-        Counts the number of empty buckets in a hash map.
+        keys = _to_list(keys)
+        value_array = DynamicArray()
+
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step * len(keys))
 
-        Returns the total count.
+        # If the hash map is empty, none of the keys can be found
+        if self.size == 0:
+            for _ in keys:
+                value_array.append(None)
+            return value_array
+
+        hashes = self._hash_candidates(keys)
+        for i in range(len(keys)):
+            if hashes[i] is None:
+                value_array.append(None)
+                continue
+            found = self._find_link(keys[i], hashes[i])
+            value_array.append(None if found is None else found.value)
+
+        return value_array
+
+    def remove_many(self, keys) -> None:
         """
-        counter = 0
+        Takes an iterable (or Dynamic Array) of keys and removes each of them
+        and its associated value from the hash map.
 
-        # Iterates through the capacity of the hash map's array
-        for i in range(self.capacity):
-            # Keeps track of the current bucket
-            bucket = self.buckets.get_at_index(i)
+        Keys not in the hash map are ignored. Shrinks the hash map at most
+        once, after every key has been removed.
+        """
+        keys = _to_list(keys)
+
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step * len(keys))
+
+        # If the hash map is empty, does nothing
+        if self.size == 0:
+            return
+
+        hashes = list(map(self.hash_function, keys))
+        for i in range(len(keys)):
+            self._remove_hashed(keys[i], hashes[i])
+
+        # Halves the capacity for as long as shrinking is enabled and the load
+        # factor would stay below the minimum, then resizes once
+        new_capacity = self.capacity
+        while new_capacity > 1 and \
+                self.size < new_capacity * self.min_load_factor:
+            new_capacity //= 2
+        if new_capacity != self.capacity:
+            self.resize_table(new_capacity)
 
-            # If the linked list of each position in the array is empty, the
-            # bucket is empty, so this increments the counter
-            if bucket.head is None:
-                counter += 1
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Takes an iterable (or Dynamic Array) of keys to check the hash map
+        for.
+
+        Returns a Dynamic Array of booleans, in the same order as the keys,
+        that are True for every key in the hash map.
+        """
+        keys = _to_list(keys)
+        result_array = DynamicArray()
+
+        if self._old_buckets is not None:
+            self._rehash_some(self.rehash_step * len(keys))
+
+        # If the hash map is empty, none of the keys can be found
+        if self.size == 0:
+            for _ in keys:
+                result_array.append(False)
+            return result_array
+
+        hashes = self._hash_candidates(keys)
+        for i in range(len(keys)):
+            if hashes[i] is None:
+                result_array.append(False)
+                continue
+            found = self._find_link(keys[i], hashes[i])
+            result_array.append(found is not None)
+
+        return result_array
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of empty buckets in a hash map.
+
+        While an incremental resize is in progress, only the new bucket array
+        is counted.
 
-        return counter
+        Returns the total count, which is kept up to date by every change to
+        the hash map, so this does not scan the buckets.
+        """
+        return self.capacity - self._occupied
 
     def table_load(self) -> float:
         """
@@ -269,50 +782,158 @@ class HashMap:
         """
         return self.size/self.capacity
 
+    def _new_buckets(self, capacity: int) -> DynamicArray:
+        """
+        Used internally to create a bucket array of the specified capacity
+        with every bucket empty.
+
+        Every bucket starts out as the shared _EMPTY_BUCKET, so this does not
+        build a linked list per bucket; _insert_link() gives a bucket its own
+        list when it receives its first link.
+        """
+        return DynamicArray([_EMPTY_BUCKET] * capacity)
+
+    def _insert_link(self, buckets, index: int, key: object, value: object,
+                     key_hash: int) -> bool:
+        """
+        Used internally to insert a key/value pair at the front of the linked
+        list of the bucket at the specified index of a bucket array, caching
+        the key's full hash on the new link.
+
+        Returns True if the bucket was empty before the insert.
+        """
+        bucket = buckets.get_at_index(index)
+        # The shared empty bucket must never hold a link
+        if bucket is _EMPTY_BUCKET:
+            bucket = LinkedList()
+            buckets.set_at_index(index, bucket)
+        was_empty = bucket.head is None
+        bucket.insert(key, value)
+        bucket.head.key_hash = key_hash
+        return was_empty
+
+    def _move_links(self, bucket, new_buckets, new_capacity) -> int:
+        """
+        Used internally to move every link of a bucket into a new bucket
+        array of the specified capacity.
+
+        Returns the number of buckets of the new array that were empty before
+        receiving a link.
+        """
+        newly_occupied = 0
+
+        # Keeps track of the links to be transferred
+        transfer_link = bucket.head
+
+        # Iterates down the bucket's linked list
+        while transfer_link is not None:
+            # Places the key/value pair in its bucket in the new array using
+            # the link's cached hash instead of calling the hash function
+            key_hash = transfer_link.key_hash
+            if self._insert_link(new_buckets, key_hash % new_capacity,
+                                 transfer_link.key, transfer_link.value,
+                                 key_hash):
+                newly_occupied += 1
+            # Moves the pointer down the linked list
+            transfer_link = transfer_link.next
+
+        return newly_occupied
+
+    def _rehash_some(self, count: int) -> None:
+        """
+        Used internally to migrate up to the specified number of old buckets
+        into the new bucket array during an incremental resize.
+
+        Ends the incremental resize once every old bucket has been migrated.
+        """
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        # Never migrates past the end of the old bucket array
+        stop = min(self._rehash_index + count, self._old_capacity)
+
+        # Moves the links of each old bucket into the new bucket array, then
+        # empties the old bucket so its links can be garbage collected
+        for i in range(self._rehash_index, stop):
+            self._occupied += self._move_links(
+                self._old_buckets.get_at_index(i), self.buckets, self.capacity)
+            self._old_buckets.set_at_index(i, _EMPTY_BUCKET)
+
+        self._rehash_index = stop
+
+        # If every old bucket has been migrated, drops the old bucket array
+        if self._rehash_index == self._old_capacity:
+            self._old_buckets = None
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start,
+                                      self._old_buckets is None)
+
     def resize_table(self, new_capacity: int) -> None:
         """
         Resizes a hash table to a new specified capacity.
 
         If the specified capacity is less than 1, does nothing.
 
-        Otherwise, creates a new hash map of the specified capacity and
-        transfers all key/object pairs to the new hash map, rehashing all
-        map links along the way.
+        Otherwise, creates a new bucket array of the specified capacity and
+        transfers all key/object pairs to it, placing them with the hashes
+        cached on their links.
+
+        If rehash_step is greater than 0, the transfer is incremental: the old
+        bucket array is kept and each later get/put/remove/contains_key
+        migrates rehash_step of its buckets, so no single operation pays for
+        the whole resize.
+
+        The specified capacity is always honored, even if it puts the load
+        factor over the maximum; the next put() grows the table again.
         """
 
         # If the new capacity is less than 1, does nothing
         if new_capacity < 1:
             return
 
-        # Creates a new hash map of the specified capacity
-        new_map = HashMap(new_capacity, self.hash_function)
-
-        # Iterates down the length of the hash map's array
-        for i in range(self.capacity):
-            # Keeps track of the current bucket
-            bucket = self.buckets.get_at_index(i)
-
-            # If the bucket is empty, continues iteration
-            if bucket.head is None:
-                continue
+        # Finishes any incremental resize still in progress, so there are
+        # never more than two bucket arrays at once. _rehash_some() records
+        # the time this takes against that resize.
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_capacity)
+
+        # Times only the work of this resize
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        # Creates a new bucket array of the specified capacity. Its buckets
+        # only get linked lists of their own once links arrive, so starting
+        # an incremental resize costs no more than copying one reference per
+        # bucket.
+        new_buckets = self._new_buckets(new_capacity)
+
+        # The new bucket array starts out empty
+        self._occupied = 0
+
+        # If resizing incrementally, keeps the old bucket array around to be
+        # migrated by later operations
+        if self.rehash_step > 0 and self.size > 0:
+            self._old_buckets = self.buckets
+            self._old_capacity = self.capacity
+            self._rehash_index = 0
+
+        # Otherwise, transfers every bucket of the hash map's array now
+        else:
+            for i in range(self.capacity):
+                self._occupied += self._move_links(
+                    self.buckets.get_at_index(i), new_buckets, new_capacity)
 
-            # Otherwise
-            else:
-                # Keeps track of the links to be transferred
-                transfer_link = bucket.head
-
-                # Iterates down the bucket's linked list
-                while transfer_link is not None:
-                    # Adds the key/value pair of the link to the new hash map
-                    # The put() method rehashes key/value pair
-                    new_map.put(transfer_link.key, transfer_link.value)
-                    # Moves the pointer down the linked list
-                    transfer_link = transfer_link.next
-
-        # Sets the main hash map's bucket pointer to the new hash map's buckets
-        self.buckets = new_map.buckets
+        # Sets the main hash map's bucket pointer to the new buckets
+        self.buckets = new_buckets
         # Updates the main hash map's capacity to the new capacity
-        self.capacity = new_map.capacity
+        self.capacity = new_capacity
+        self._mod_count += 1
+
+        # An incremental resize is only counted once its last step runs
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start,
+                                      self._old_buckets is None)
 
     def get_keys(self) -> DynamicArray:
         """
@@ -321,29 +942,113 @@ class HashMap:
         # Initializes a new array
         key_array = DynamicArray()
 
-        # If the hash map is not empty, there are keys in it
-        if self.size > 0:
-
-            # Iterates through the capacity of the hash map's array
-            for i in range(self.capacity):
-                # Keeps track of the current bucket
-                bucket = self.buckets.get_at_index(i)
-                # If the bucket is empty, continues to the next iteration
-                if bucket.head is None:
-                    continue
-                # Otherwise
-                else:
-                    # Keeps track of the current link
-                    cur_link = bucket.head
-                    # Iterates down the length of the
-                    while cur_link is not None:
-                        # Appends the current link's key to the array
-                        key_array.append(cur_link.key)
-                        # Moves the pointer to the next link
-                        cur_link = cur_link.next
+        # Appends every key streamed by the key iterator to the array
+        for key in self.keys():
+            key_array.append(key)
 
         return key_array
 
+    def _iter_links(self):
+        """
+        Used internally to generate every link of the hash map, in bucket
+        order, without copying them.
+
+        Finishes any incremental resize in progress first, so lookups made
+        while iterating never move links around.
+
+        Raises HashMapException if the hash map gains or loses a key, is
+        cleared or is resized while the generator is in use.
+        """
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_capacity)
+
+        # Remembers the modification count to check it after every yield
+        mod_count = self._mod_count
+        buckets = self.buckets
+
+        # Iterates through each bucket of the hash map's array
+        for i in range(self.capacity):
+            # Keeps track of the current link
+            cur_link = buckets.get_at_index(i).head
+            # Iterates down the length of the linked list
+            while cur_link is not None:
+                yield cur_link
+                # Fails fast if the hash map changed while the link was out
+                if self._mod_count != mod_count:
+                    raise HashMapException('hash map changed during iteration')
+                # Moves the pointer to the next link
+                cur_link = cur_link.next
+
+    def keys(self):
+        """
+        Generates every key stored in the hash map.
+        """
+        for link in self._iter_links():
+            yield link.key
+
+    def values(self):
+        """
+        Generates every object stored in the hash map.
+        """
+        for link in self._iter_links():
+            yield link.value
+
+    def items(self):
+        """
+        Generates a (key, object) tuple for every pair stored in the hash map.
+        """
+        for link in self._iter_links():
+            yield link.key, link.value
+
+    def __iter__(self):
+        """
+        Generates every key stored in the hash map.
+        """
+        return self.keys()
+
+    def hashed_items(self):
+        """
+        Generates a (hash, key, object) tuple for every pair stored in the
+        hash map, with the hash cached for the key, so the pairs can be saved
+        and restored by from_hashed_items() without hashing any key again.
+        """
+        for link in self._iter_links():
+            yield link.key_hash, link.key, link.value
+
+    @classmethod
+    def from_hashed_items(cls, capacity: int, function,
+                          hashed_items) -> 'HashMap':
+        """
+        Takes a capacity, a hash function and an iterable of (hash, key,
+        object) tuples, as generated by hashed_items(), with no key repeated.
+
+        Returns a new HashMap of the specified capacity holding every pair.
+        Each pair is placed using its given hash, so the hash function is not
+        called; hashes made by a different function give a broken map.
+        """
+        hash_map = cls(capacity, function)
+        buckets = hash_map.buckets
+
+        for key_hash, key, value in hashed_items:
+            if hash_map._insert_link(buckets, key_hash % capacity, key, value,
+                                     key_hash):
+                hash_map._occupied += 1
+            hash_map.size += 1
+
+        return hash_map
+
+    def freeze(self) -> FrozenHashMap:
+        """
+        Returns an immutable FrozenHashMap holding every key/object pair
+        currently in the hash map.
+
+        The frozen map's get() and contains_key() look at exactly one slot
+        and need no locks, and it takes far less memory, so it suits maps
+        that are built once and then only read. Later changes to this hash
+        map do not affect it.
+        """
+        return FrozenHashMap(self.items())
+
 
 # BASIC TESTING
 if __name__ == "__main__":
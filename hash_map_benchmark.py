@@ -0,0 +1,382 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Benchmark Suite
+# Description: Defines a benchmark harness that runs reproducible workloads
+#              against the hash map engines (separate chaining, open
+#              addressing, cuckoo and ordered) with any registered hash
+#              function, from a thousand to ten million keys. Every workload
+#              is a list of phases (put, get, remove or resize_table calls);
+#              each phase reports its throughput and the p50 and p99 latency
+#              of a sample of its calls, and each run reports the peak memory
+#              it allocated, measured in a separate pass under tracemalloc so
+#              the timings are not slowed down. Results are printed as a table
+#              and can be written as JSON to compare runs over time.
+#
+#              Workloads are generated from the seed before timing, so a run
+#              repeats exactly, except under the builtin and generic hash
+#              functions: they hash str keys with a seed picked per process,
+#              so bucket layouts (and the adversarial keys) differ between
+#              runs unless PYTHONHASHSEED is set. The seed used is saved with
+#              the JSON results.
+#
+#              Workloads:
+#                uniform     -- put every key, get every key and as many
+#                               absent keys in random order, remove every key
+#                zipfian     -- put every key, then get keys drawn from a
+#                               Zipf distribution, so a few are very hot
+#                adversarial -- put and get keys chosen so their hashes are
+#                               all multiples of 64 and crowd the same buckets
+#                               (built directly for hash_function_1 and
+#                               hash_function_2; found by search, and capped
+#                               at 100000 keys, for the others)
+#                heavy_delete -- put every key, remove three quarters, get
+#                               every key, put the removed keys back, remove
+#                               every key
+#                growth      -- put every key into a map of capacity 1, then
+#                               resize the table up and back down
+#
+#              Example:
+#                python hash_map_benchmark.py --sizes 1000 100000 \
+#                    --hash-functions fnv1a builtin --output results.json
+
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from hash_functions import HASH_FUNCTIONS
+from hash_map import HashMap, hash_function_1, hash_function_2
+from hash_map_cuckoo import CuckooHashMap
+from hash_map_oa import OpenAddressHashMap
+from hash_map_ordered import OrderedHashMap
+
+
+# Hash map engines selectable by name; all take (capacity, function)
+ENGINES = {
+    'chained': HashMap,
+    'open_addressing': OpenAddressHashMap,
+    'cuckoo': CuckooHashMap,
+    'ordered': OrderedHashMap,
+}
+
+WORKLOADS = ('uniform', 'zipfian', 'adversarial', 'heavy_delete', 'growth')
+
+# Capacity every workload but growth starts from
+INITIAL_CAPACITY = 16
+
+# Exponent of the Zipf distribution of the zipfian workload
+ZIPF_EXPONENT = 0.99
+
+# Adversarial keys all have hashes divisible by this, so in a table whose
+# capacity is a power of two they only ever use 1 / 64 of the buckets
+COLLISION_MODULUS = 64
+
+# Most adversarial keys found by search, for hash functions whose colliding
+# keys cannot be built directly; each costs about COLLISION_MODULUS hash calls
+MAX_SEARCHED_KEYS = 100000
+
+
+def _keys(prefix: str, count: int) -> list:
+    """
+    Used internally to generate count distinct str keys.
+    """
+    return [prefix + str(i) for i in range(count)]
+
+
+def _padded_key(function, i: int) -> str:
+    """
+    Used internally to build the i-th adversarial key for hash_function_1 or
+    hash_function_2, which add up each character's code point times a known
+    weight: one last character is chosen to bring the hash to a multiple of
+    COLLISION_MODULUS.
+    """
+    key = 'adv' + str(i)
+    # hash_function_2 weighs the last character by the key's length, which
+    # must be odd to have an inverse modulo COLLISION_MODULUS
+    if function is hash_function_2 and len(key) % 2 == 1:
+        key += '_'
+    weight = 1 if function is hash_function_1 else len(key) + 1
+    needed = -function(key) * pow(weight, -1, COLLISION_MODULUS) % \
+        COLLISION_MODULUS
+    # Adding any multiple of COLLISION_MODULUS to the character keeps the
+    # hash a multiple too, and varying it spreads the keys over many hashes
+    # instead of the handful their digits alone give
+    return key + chr(0x100 + COLLISION_MODULUS * (i % 256) + needed)
+
+
+def _colliding_keys(function, count: int) -> list:
+    """
+    Used internally to generate distinct str keys whose hashes under the
+    specified function are all multiples of COLLISION_MODULUS.
+
+    Builds count keys directly for hash_function_1 and hash_function_2. Any
+    other function is searched one candidate key at a time, so at most
+    MAX_SEARCHED_KEYS keys are generated.
+    """
+    if function is hash_function_1 or function is hash_function_2:
+        return [_padded_key(function, i) for i in range(count)]
+
+    count = min(count, MAX_SEARCHED_KEYS)
+    keys = []
+    for i in itertools.count():
+        key = 'adv' + str(i)
+        if function(key) % COLLISION_MODULUS == 0:
+            keys.append(key)
+            if len(keys) == count:
+                return keys
+
+
+def build_workload(workload: str, size: int, function, seed: int) -> tuple:
+    """
+    Takes a workload name, a number of keys, a hash function and a seed.
+
+    Returns a (initial capacity, phases) tuple, where phases is a list of
+    (label, method name, arguments) tuples: one call of the method per
+    argument. The same arguments always give the same workload, as long as
+    the hash function does not change between processes. The adversarial
+    workload may have fewer keys than asked for; see _colliding_keys().
+    """
+    rng = random.Random(seed)
+
+    if workload == 'adversarial':
+        keys = _colliding_keys(function, size)
+    else:
+        keys = _keys('key', size)
+
+    order = keys[:]
+    rng.shuffle(order)
+
+    if workload == 'uniform':
+        misses = _keys('miss', size)
+        rng.shuffle(misses)
+        return INITIAL_CAPACITY, [
+            ('put', 'put', keys),
+            ('get_hit', 'get', order),
+            ('get_miss', 'get', misses),
+            ('remove', 'remove', order),
+        ]
+
+    if workload == 'zipfian':
+        # The i-th key of the shuffled order is the i-th most popular
+        weights = itertools.accumulate(1 / (rank ** ZIPF_EXPONENT)
+                                       for rank in range(1, size + 1))
+        lookups = rng.choices(order, cum_weights=list(weights), k=size)
+        return INITIAL_CAPACITY, [
+            ('put', 'put', keys),
+            ('get_zipf', 'get', lookups),
+        ]
+
+    if workload == 'adversarial':
+        return INITIAL_CAPACITY, [
+            ('put', 'put', keys),
+            ('get_hit', 'get', order),
+        ]
+
+    if workload == 'heavy_delete':
+        removed = order[:size * 3 // 4]
+        rng.shuffle(order)
+        return INITIAL_CAPACITY, [
+            ('put', 'put', keys),
+            ('remove_most', 'remove', removed),
+            ('get_mixed', 'get', order),
+            ('put_back', 'put', removed),
+            ('remove_all', 'remove', keys),
+        ]
+
+    if workload == 'growth':
+        # Capacities are filled in when the phase runs, from the grown map
+        return 1, [
+            ('put', 'put', keys),
+            ('resize_up', 'resize_table', None),
+            ('resize_down', 'resize_table', None),
+        ]
+
+    raise ValueError('unknown workload ' + str(workload))
+
+
+def _percentile(samples: list, fraction: float) -> int:
+    """
+    Used internally to read a percentile from sorted samples.
+    """
+    if not samples:
+        return 0
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def _run_phases(hash_map, phases: list, sample_every: int,
+                results: list = None) -> None:
+    """
+    Used internally to run every phase of a workload against a hash map,
+    appending a result dictionary per phase to results, if given.
+    """
+    clock = time.perf_counter_ns
+    # Capacity the map had grown to before the resize phases
+    grown_capacity = None
+
+    for label, method_name, arguments in phases:
+        method = getattr(hash_map, method_name)
+
+        if arguments is None:
+            # Resizes to four times the capacity, then back to the original
+            if grown_capacity is None:
+                grown_capacity = hash_map.capacity
+                arguments = [grown_capacity * 4]
+            else:
+                arguments = [grown_capacity]
+
+        samples = []
+        start = clock()
+        if method_name == 'put':
+            for i, key in enumerate(arguments):
+                # Times every sample_every-th call on its own
+                if i % sample_every == 0:
+                    call_start = clock()
+                    method(key, key)
+                    samples.append(clock() - call_start)
+                else:
+                    method(key, key)
+        else:
+            for i, argument in enumerate(arguments):
+                if i % sample_every == 0:
+                    call_start = clock()
+                    method(argument)
+                    samples.append(clock() - call_start)
+                else:
+                    method(argument)
+        seconds = (clock() - start) / 1e9
+
+        if results is not None:
+            samples.sort()
+            results.append({
+                'phase': label,
+                'operations': len(arguments),
+                'seconds': seconds,
+                'ops_per_second': len(arguments) / seconds if seconds else 0.0,
+                'p50_ns': _percentile(samples, 0.5),
+                'p99_ns': _percentile(samples, 0.99),
+                'samples': len(samples),
+            })
+
+
+def run_benchmark(engine: str, function_name: str, workload: str, size: int,
+                  seed: int = 261, sample_every: int = 16,
+                  measure_memory: bool = True) -> dict:
+    """
+    Takes an engine name, a hash function name, a workload name, a number of
+    keys and a seed.
+
+    Runs the workload on a new hash map and returns a dictionary of the
+    settings, each phase's results, the final size and capacity and, if
+    measure_memory is True, the peak bytes allocated while running it again
+    under tracemalloc. The keys are generated before either run, so they are
+    not counted.
+    """
+    function = HASH_FUNCTIONS[function_name]
+    engine_class = ENGINES[engine]
+    capacity, phases = build_workload(workload, size, function, seed)
+
+    phase_results = []
+    hash_map = engine_class(capacity, function)
+    _run_phases(hash_map, phases, sample_every, phase_results)
+
+    result = {
+        'engine': engine,
+        'hash_function': function_name,
+        'workload': workload,
+        'size': size,
+        'seed': seed,
+        'phases': phase_results,
+        'final_size': hash_map.size,
+        'final_capacity': hash_map.capacity,
+        'peak_memory_bytes': None,
+    }
+    hash_map = None
+
+    if measure_memory:
+        tracemalloc.start()
+        hash_map = engine_class(capacity, function)
+        _run_phases(hash_map, phases, sample_every)
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def _positive_int(text: str) -> int:
+    """
+    Used internally to parse a command line argument that must be an int of
+    at least 1.
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError('must be at least 1')
+    return value
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs the benchmarks selected on the command line, prints a results table
+    and writes the results as JSON if an output file is given.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the hash map engines on reproducible '
+                    'workloads.')
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES),
+                        default=['chained'])
+    parser.add_argument('--hash-functions', nargs='+',
+                        choices=sorted(HASH_FUNCTIONS), default=['fnv1a'])
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS,
+                        default=list(WORKLOADS))
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[1000, 10000, 100000],
+                        help='numbers of keys, up to 10000000')
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--sample-every', type=_positive_int, default=16,
+                        help='time every n-th call for the latencies')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the tracemalloc pass')
+    parser.add_argument('--output', help='file to write JSON results to')
+    args = parser.parse_args(argv)
+
+    results = []
+    print('{:16} {:16} {:12} {:>9} {:12} {:>13} {:>9} {:>9} {:>12}'.format(
+        'engine', 'hash function', 'workload', 'size', 'phase', 'ops/s',
+        'p50 ns', 'p99 ns', 'peak bytes'))
+
+    for engine, function_name, workload, size in itertools.product(
+            args.engines, args.hash_functions, args.workloads, args.sizes):
+        result = run_benchmark(engine, function_name, workload, size,
+                               args.seed, args.sample_every,
+                               not args.no_memory)
+        results.append(result)
+        for phase in result['phases']:
+            print('{:16} {:16} {:12} {:9} {:12} {:13.0f} {:9} {:9} {:>12}'
+                  .format(engine, function_name, workload, size,
+                          phase['phase'], phase['ops_per_second'],
+                          phase['p50_ns'], phase['p99_ns'],
+                          str(result['peak_memory_bytes'])))
+        sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'python_hash_seed': os.environ.get('PYTHONHASHSEED'),
+                'arguments': vars(args),
+                'results': results,
+            }, output, indent=2)
+
+    return 0
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+    sys.exit(main())
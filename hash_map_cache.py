@@ -0,0 +1,422 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Bounded Cache
+# Description: Defines a bounded cache built on the HashMap class. The hash
+#              map finds a key's entry in O(1) and the entries are also
+#              threaded on intrusive doubly linked lists that order them for
+#              eviction: by recency for LRU, by insertion time for TTL, and
+#              in frequency buckets (one list per use count, least recently
+#              used first) for LFU. The cache can be bounded by number of
+#              entries, by total bytes, or both, and keeps hit, miss,
+#              eviction and expiration counters.
+
+
+import sys
+import time
+
+from hash_map import HashMap, HashMapException
+
+
+class _CacheEntry:
+    """
+    Key/value pair stored in the cache, linked into an eviction list
+    """
+    __slots__ = ('key', 'value', 'size', 'expires', 'frequency', 'owner',
+                 'prev', 'next')
+
+    def __init__(self, key, value, size: int, expires: float) -> None:
+        self.key = key
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.frequency = 1
+        # Frequency bucket holding the entry (LFU only)
+        self.owner = None
+        self.prev = None
+        self.next = None
+
+
+class _EntryList:
+    """
+    Circular doubly linked list of cache entries with a sentinel node.
+    New entries go at the front; the back holds the next one to evict.
+    """
+    __slots__ = ('sentinel', 'length', 'frequency', 'prev', 'next')
+
+    def __init__(self, frequency: int = 0) -> None:
+        self.sentinel = _CacheEntry(None, None, 0, 0.0)
+        self.sentinel.prev = self.sentinel
+        self.sentinel.next = self.sentinel
+        self.length = 0
+        # Used when the list is an LFU frequency bucket, which is itself
+        # linked to its neighboring buckets in increasing frequency order
+        self.frequency = frequency
+        self.prev = None
+        self.next = None
+
+    def push_front(self, entry: _CacheEntry) -> None:
+        entry.prev = self.sentinel
+        entry.next = self.sentinel.next
+        self.sentinel.next.prev = entry
+        self.sentinel.next = entry
+        self.length += 1
+
+    def unlink(self, entry: _CacheEntry) -> None:
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+        entry.prev = None
+        entry.next = None
+        self.length -= 1
+
+    def back(self) -> _CacheEntry:
+        """
+        Returns the entry at the back of the list, or None if it is empty.
+        """
+        if self.length == 0:
+            return None
+        return self.sentinel.prev
+
+
+class HashMapCache:
+    # Supported eviction policies
+    POLICIES = ('lru', 'lfu', 'ttl')
+
+    def __init__(self, function, max_entries: int = None,
+                 max_bytes: int = None, policy: str = 'lru',
+                 ttl: float = None, sizeof=None, clock=time.monotonic) -> None:
+        """
+        Init new HashMapCache using the specified hash function for its
+        HashMap.
+
+        max_entries and max_bytes bound the number of entries and their total
+        size in bytes (None for no bound). max_entries must be at least 1,
+        since the entry just put is never evicted. The size of an entry is measured
+        with sizeof(key, value), which defaults to the shallow sys.getsizeof
+        of the key plus the value.
+
+        policy picks the entry evicted when a bound is exceeded: 'lru' the
+        least recently used, 'lfu' the least frequently used (least recently
+        used among ties) and 'ttl' the one closest to expiring. If ttl is set,
+        entries expire that many seconds after they were last put, whatever
+        the policy; the 'ttl' policy requires it.
+        """
+        if policy not in self.POLICIES:
+            raise HashMapException('unknown eviction policy ' + str(policy))
+        if policy == 'ttl' and ttl is None:
+            raise HashMapException('the ttl policy needs a ttl')
+        if max_entries is not None and max_entries < 1:
+            raise HashMapException('max_entries must be at least 1')
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.ttl = ttl
+        self._sizeof = sizeof if sizeof is not None else \
+            lambda key, value: sys.getsizeof(key) + sys.getsizeof(value)
+        self._clock = clock
+
+        self._map = HashMap(16 if max_entries is None else max_entries,
+                            function)
+        self.bytes = 0
+
+        # Eviction order for LRU and TTL
+        self._order = _EntryList()
+        # Sentinel of the circular list of LFU frequency buckets, lowest
+        # frequency first
+        self._frequencies = _EntryList()
+        self._frequencies.prev = self._frequencies
+        self._frequencies.next = self._frequencies
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __str__(self) -> str:
+        """
+        Return the cache's counters in human-readable form
+        """
+        return 'CACHE ' + self.policy + ' ' + str(self.stats())
+
+    @property
+    def size(self) -> int:
+        """
+        Number of entries in the cache.
+        """
+        return self._map.size
+
+    def stats(self) -> dict:
+        """
+        Returns a dictionary of the cache's size and counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': self._map.size,
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def _link(self, entry: _CacheEntry) -> None:
+        """
+        Used internally to add a new entry to the eviction order.
+        """
+        if self.policy != 'lfu':
+            self._order.push_front(entry)
+            return
+
+        # New entries have been used once, so they join the frequency 1
+        # bucket, which is always the lowest one
+        first = self._frequencies.next
+        if first is self._frequencies or first.frequency != 1:
+            first = self._insert_bucket(self._frequencies, 1)
+        entry.frequency = 1
+        entry.owner = first
+        first.push_front(entry)
+
+    def _unlink(self, entry: _CacheEntry) -> None:
+        """
+        Used internally to take an entry out of the eviction order.
+        """
+        if self.policy != 'lfu':
+            self._order.unlink(entry)
+            return
+
+        bucket = entry.owner
+        bucket.unlink(entry)
+        entry.owner = None
+        if bucket.length == 0:
+            self._remove_bucket(bucket)
+
+    def _insert_bucket(self, after: _EntryList,
+                       frequency: int) -> _EntryList:
+        """
+        Used internally to add an empty LFU frequency bucket after another.
+        """
+        bucket = _EntryList(frequency)
+        bucket.prev = after
+        bucket.next = after.next
+        after.next.prev = bucket
+        after.next = bucket
+        return bucket
+
+    def _remove_bucket(self, bucket: _EntryList) -> None:
+        """
+        Used internally to drop an empty LFU frequency bucket.
+        """
+        bucket.prev.next = bucket.next
+        bucket.next.prev = bucket.prev
+
+    def _touch(self, entry: _CacheEntry) -> None:
+        """
+        Used internally to record a use of an entry.
+        """
+        if self.policy == 'lru':
+            self._order.unlink(entry)
+            self._order.push_front(entry)
+
+        elif self.policy == 'lfu':
+            # Moves the entry to the bucket for its next frequency, creating
+            # that bucket right after the current one if needed
+            bucket = entry.owner
+            entry.frequency += 1
+            target = bucket.next
+            if target is self._frequencies or \
+                    target.frequency != entry.frequency:
+                target = self._insert_bucket(bucket, entry.frequency)
+            bucket.unlink(entry)
+            if bucket.length == 0:
+                self._remove_bucket(bucket)
+            entry.owner = target
+            target.push_front(entry)
+
+        # TTL order does not change on use
+
+    def _victim(self) -> _CacheEntry:
+        """
+        Used internally to find the entry the policy evicts next.
+        """
+        if self.policy == 'lfu':
+            return self._frequencies.next.back()
+        return self._order.back()
+
+    def _drop(self, entry: _CacheEntry) -> None:
+        """
+        Used internally to remove an entry from the cache.
+        """
+        self._unlink(entry)
+        self._map.remove(entry.key)
+        self.bytes -= entry.size
+
+    def get(self, key) -> object:
+        """
+        Takes a key to search for in the cache.
+
+        Returns the object associated with the key, counting a hit.
+
+        Otherwise, if the key is not cached or has expired, counts a miss and
+        returns None.
+        """
+        entry = self._map.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        # Expired entries are dropped lazily, when they are next looked up
+        if self.ttl is not None and entry.expires <= self._clock():
+            self._drop(entry)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touch(entry)
+        return entry.value
+
+    def contains_key(self, key) -> bool:
+        """
+        Checks the cache for a key that has not expired, without counting a
+        hit or miss or changing the eviction order.
+        """
+        entry = self._map.get(key)
+        if entry is None:
+            return False
+        return self.ttl is None or entry.expires > self._clock()
+
+    def put(self, key, value: object) -> None:
+        """
+        Takes a key and an object to pair with it and caches them, replacing
+        any object already cached for the key.
+
+        Evicts entries according to the policy until the cache is back within
+        its bounds. An entry too large for max_bytes on its own is not cached.
+        """
+        size = self._sizeof(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.remove(key)
+            return
+
+        expires = self._clock() + self.ttl if self.ttl is not None else 0.0
+        entry = self._map.get(key)
+
+        # Replaces the value of a cached key; a put counts as a use
+        if entry is not None:
+            self.bytes += size - entry.size
+            entry.value = value
+            entry.size = size
+            entry.expires = expires
+            if self.policy == 'ttl':
+                # Re-putting restarts the entry's time to live
+                self._order.unlink(entry)
+                self._order.push_front(entry)
+            else:
+                self._touch(entry)
+
+        # Otherwise, caches a new entry
+        else:
+            entry = _CacheEntry(key, value, size, expires)
+            self._map.put(key, entry)
+            self._link(entry)
+            self.bytes += size
+
+        self._evict(entry)
+
+    def _evict(self, keep: _CacheEntry) -> None:
+        """
+        Used internally to evict entries until the cache is within its
+        bounds, never evicting the entry that was just put.
+        """
+        # With a TTL policy, expired entries at the back go first for free
+        if self.policy == 'ttl':
+            now = self._clock()
+            victim = self._order.back()
+            while victim is not None and victim is not keep and \
+                    victim.expires <= now:
+                self._drop(victim)
+                self.expirations += 1
+                victim = self._order.back()
+
+        while (self.max_entries is not None and
+               self._map.size > self.max_entries) or \
+                (self.max_bytes is not None and self.bytes > self.max_bytes):
+            victim = self._victim()
+            # For LFU the new entry can be the only one in the lowest bucket;
+            # the next lowest bucket then holds the victim
+            if victim is keep:
+                if self.policy == 'lfu':
+                    victim = self._frequencies.next.next.back()
+                else:
+                    victim = victim.prev if victim.prev is not \
+                        self._order.sentinel else None
+            if victim is None:
+                break
+            self._drop(victim)
+            self.evictions += 1
+
+    def remove(self, key) -> None:
+        """
+        Removes the specified key and its object from the cache.
+
+        If the key is not cached, this does nothing.
+        """
+        entry = self._map.get(key)
+        if entry is not None:
+            self._drop(entry)
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache. Does not reset the counters.
+        """
+        self._map.clear()
+        self.bytes = 0
+        self._order = _EntryList()
+        self._frequencies.prev = self._frequencies
+        self._frequencies.next = self._frequencies
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    from hash_map import hash_function_2
+
+    print("\nLRU example")
+    print("-----------")
+    c = HashMapCache(hash_function_2, max_entries=3)
+    for key in ('a', 'b', 'c'):
+        c.put(key, key.upper())
+    c.get('a')
+    c.put('d', 'D')
+    print(c.contains_key('a'), c.contains_key('b'), c)
+
+    print("\nLFU example")
+    print("-----------")
+    c = HashMapCache(hash_function_2, max_entries=3, policy='lfu')
+    for key in ('a', 'b', 'c'):
+        c.put(key, key.upper())
+    for key in ('a', 'a', 'b', 'c', 'c'):
+        c.get(key)
+    c.put('d', 'D')
+    print(c.contains_key('b'), c.contains_key('d'), c)
+
+    print("\nTTL example")
+    print("-----------")
+    now = [0.0]
+    c = HashMapCache(hash_function_2, max_entries=10, policy='ttl', ttl=5,
+                     clock=lambda: now[0])
+    c.put('a', 1)
+    now[0] = 3
+    c.put('b', 2)
+    now[0] = 6
+    print(c.get('a'), c.get('b'), c)
+
+    print("\nbyte bound example")
+    print("------------------")
+    c = HashMapCache(hash_function_2, max_bytes=100,
+                     sizeof=lambda key, value: len(value))
+    for i in range(10):
+        c.put('key' + str(i), 'x' * 30)
+    print(c.size, c.bytes, c)
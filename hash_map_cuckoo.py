@@ -0,0 +1,389 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Cuckoo Hash Map
+# Description: Defines a cuckoo hashing Hash Map ADT with the same methods as
+#              the separate chaining HashMap. Every key has exactly one
+#              possible slot in each of two tables, chosen by two independent
+#              hash functions, plus a small stash for the rare keys that fit
+#              nowhere, so get() and contains_key() probe at most two slots
+#              and the stash no matter how the keys collide. put() makes room
+#              by kicking keys to their other table; if that cycles and the
+#              stash is full, both tables are rebuilt with new hash seeds.
+#              Keys whose 64-bit codes are identical (the code must agree
+#              with ==, so it can only come from the hash function and the
+#              built-in hash) can never be separated by new seeds. A put()
+#              that would need more of them than the two slots and the stash
+#              can hold raises HashMapException instead of growing forever.
+
+
+import random
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+from hash_map import HashMapException
+
+
+_MASK_64 = 0xffffffffffffffff
+
+
+def _mix(value: int, seed: int) -> int:
+    """
+    Used internally to derive a well scrambled 64-bit value from a hash and
+    a seed (the SplitMix64 finalizer), so that new seeds move every key.
+    """
+    value = (value ^ seed) & _MASK_64
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & _MASK_64
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & _MASK_64
+    return value ^ (value >> 31)
+
+
+class CuckooHashMap:
+    # Fraction of all slots that may be filled before put() grows the tables
+    max_load_factor = 0.45
+    # Entries the stash can hold; get() probes at most 2 + stash_size slots
+    stash_size = 4
+    # Rebuilds with new seeds tried before the tables are grown instead
+    max_rehashes = 8
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Init new CuckooHashMap with the specified total number of slots,
+        split evenly between its two tables.
+
+        Each key's hash from the specified function is combined with its
+        built-in hash into one 64-bit code, and each table scrambles that code
+        with its own seed. The two slot functions are therefore independent
+        even when the specified function is weak (hash_function_1 gives every
+        anagram the same hash), which cuckoo hashing relies on.
+        """
+        self.hash_function = function
+        self.size = 0
+        self._random = random.Random()
+        self._new_tables(max(capacity // 2, 1))
+
+    def _new_tables(self, table_capacity: int) -> None:
+        """
+        Used internally to start over with two empty tables of the specified
+        size, an empty stash and new hash seeds.
+        """
+        self._table_capacity = table_capacity
+        self.capacity = 2 * table_capacity
+        # Each slot holds None or a (key, value, code) tuple; keeping the code
+        # means rebuilding never hashes a key again
+        self._tables = ([None] * table_capacity, [None] * table_capacity)
+        self._stash = []
+        self._seeds = (self._random.getrandbits(64),
+                       self._random.getrandbits(64))
+        # A displacement chain longer than this is treated as a cycle
+        self._max_kicks = max(16, 6 * table_capacity.bit_length())
+
+    def __str__(self) -> str:
+        """
+        Return content of hash map in human-readable form
+        """
+        out = ''
+        for t in range(2):
+            for i in range(self._table_capacity):
+                entry = self._tables[t][i]
+                out += str(t) + '.' + str(i) + ': '
+                if entry is None:
+                    out += 'None\n'
+                else:
+                    out += str(entry[0]) + ': ' + str(entry[1]) + '\n'
+        for entry in self._stash:
+            out += 'stash: ' + str(entry[0]) + ': ' + str(entry[1]) + '\n'
+        return out
+
+    def _code(self, key) -> int:
+        """
+        Used internally to compute the 64-bit code both slots of a key are
+        derived from.
+        """
+        return _mix(self.hash_function(key), 0) ^ (hash(key) & _MASK_64)
+
+    def _slot(self, table: int, code: int) -> int:
+        """
+        Used internally to find the slot of a code in one of the tables.
+        """
+        return _mix(code, self._seeds[table]) % self._table_capacity
+
+    def _locate(self, key, code: int) -> tuple:
+        """
+        Used internally to find a key. Probes one slot in each table and the
+        stash, and nothing else.
+
+        Returns a (table, slot) tuple, with table 2 meaning the stash, if the
+        key is found.
+        Otherwise, returns None.
+        """
+        for table in (0, 1):
+            slot = self._slot(table, code)
+            entry = self._tables[table][slot]
+            if entry is not None and entry[2] == code and entry[0] == key:
+                return table, slot
+
+        for i in range(len(self._stash)):
+            entry = self._stash[i]
+            if entry[2] == code and entry[0] == key:
+                return 2, i
+
+        return None
+
+    def _entries_of(self, table: int) -> list:
+        """
+        Used internally to get the list a table number from _locate() refers
+        to: one of the two tables or the stash.
+        """
+        if table == 2:
+            return self._stash
+        return self._tables[table]
+
+    def _place(self, entry: tuple):
+        """
+        Used internally to place a new entry, kicking entries to their other
+        table until every entry has a slot, and falling back to the stash if
+        the kicks run too long.
+
+        Returns None if every entry was placed.
+        Otherwise, returns the entry left without a slot.
+        """
+        table = 0
+        tables = self._tables
+
+        for _ in range(self._max_kicks):
+            slot = self._slot(table, entry[2])
+            # Swaps the entry into its slot; whatever was there is kicked
+            entry, tables[table][slot] = tables[table][slot], entry
+            if entry is None:
+                return None
+            # The kicked entry moves to its slot in the other table
+            table = 1 - table
+
+        if len(self._stash) < self.stash_size:
+            self._stash.append(entry)
+            return None
+        return entry
+
+    def _rebuild(self, table_capacity: int, extra: tuple = None,
+                 new: tuple = None) -> None:
+        """
+        Used internally to move every entry (and an extra one, if given) into
+        new tables of the specified size, trying new seeds until they all fit
+        and doubling the size whenever max_rehashes seeds in a row fail.
+
+        If new is the entry being put and the tables grow to more than eight
+        slots per entry without every entry fitting, too many keys share
+        identical codes for any seeds to separate them. The entries are then
+        rebuilt without the new one and HashMapException is raised.
+        """
+        entries = [entry for table in self._tables for entry in table
+                   if entry is not None] + self._stash
+        if extra is not None:
+            entries.append(extra)
+
+        first_capacity = table_capacity
+        refused = None
+        attempts = 0
+        while True:
+            self._new_tables(table_capacity)
+            if all(self._place(entry) is None for entry in entries):
+                break
+            attempts += 1
+            if attempts == self.max_rehashes:
+                attempts = 0
+                table_capacity *= 2
+                # Gives up on the new entry; the others fit before it came
+                if new is not None and table_capacity > 8 * len(entries):
+                    entries = [entry for entry in entries if entry is not new]
+                    table_capacity = first_capacity
+                    refused = new
+                    new = None
+
+        if refused is not None:
+            raise HashMapException('too many keys share the hash code of ' +
+                                   repr(refused[0]))
+
+    def clear(self) -> None:
+        """
+        Clears the contents of a hash map.
+
+        Does not change capacity.
+        """
+        self._new_tables(self._table_capacity)
+        self.size = 0
+
+    def get(self, key) -> object:
+        """
+        Takes a key to search for in a hash map.
+
+        Returns the object associated with the specified key.
+
+        Otherwise, if the key is not in the hash map, returns None.
+        """
+        code = self._code(key)
+        found = self._locate(key, code)
+        if found is None:
+            return None
+        table, slot = found
+        return self._entries_of(table)[slot][1]
+
+    def put(self, key, value: object) -> None:
+        """
+        Takes a key and an object to pair with the key and puts it in a hash
+        map.
+
+        If the key is already associated with a paired object, it replaces the
+        key's current object with the new object.
+
+        Otherwise, inserts the key/object pair into the hash map.
+
+        Raises HashMapException, leaving the hash map unchanged, if the key
+        shares its 64-bit code with so many keys already in the hash map that
+        they cannot all fit in its two slots and the stash.
+        """
+        code = self._code(key)
+        entry = (key, value, code)
+
+        found = self._locate(key, code)
+        if found is not None:
+            table, slot = found
+            self._entries_of(table)[slot] = entry
+            return
+
+        # Grows before the tables get too full for kicks to settle quickly
+        if self.size + 1 > self.capacity * self.max_load_factor:
+            self._rebuild(self._table_capacity * 2, entry, entry)
+
+        # If the entry could not be placed and the stash is full, rebuilds
+        # the tables with new seeds
+        else:
+            homeless = self._place(entry)
+            if homeless is not None:
+                self._rebuild(self._table_capacity, homeless, entry)
+
+        # Only counted once it is placed, since _rebuild() can refuse it
+        self.size += 1
+
+    def remove(self, key) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+
+        If the specified key is not in the hash map, this does nothing.
+        """
+        code = self._code(key)
+        found = self._locate(key, code)
+        if found is None:
+            return
+
+        table, slot = found
+        self.size -= 1
+        if table == 2:
+            self._stash.pop(slot)
+            return
+
+        # Moves a stashed entry into the freed slot if it belongs there, so
+        # the stash has room again for later puts
+        self._tables[table][slot] = None
+        for i in range(len(self._stash)):
+            if self._slot(table, self._stash[i][2]) == slot:
+                self._tables[table][slot] = self._stash.pop(i)
+                return
+
+    def contains_key(self, key) -> bool:
+        """
+        Checks the hash map for a specified key.
+
+        Returns True if the key is in the hash map.
+        Otherwise, returns False.
+        """
+        return self._locate(key, self._code(key)) is not None
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of empty slots across both tables.
+
+        Returns the total count.
+        """
+        return self._tables[0].count(None) + self._tables[1].count(None)
+
+    def table_load(self) -> float:
+        """
+        Calculates the load factor of a hash map, which is the fraction of
+        slots holding a key/value pair.
+
+        Returns the load factor of the hash map.
+        """
+        return self.size / self.capacity
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes a hash table to a new specified total number of slots.
+
+        If the specified capacity could not hold every key/object pair, does
+        nothing.
+
+        Otherwise, rebuilds both tables at the new size using the code kept
+        with each pair. The tables may end up larger than requested if the
+        pairs cannot all be placed at that size.
+        """
+        if new_capacity < 1 or new_capacity < self.size:
+            return
+        self._rebuild(max(new_capacity // 2, 1))
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a Dynamic Array containing all keys stored in a hash map.
+        """
+        key_array = DynamicArray()
+        for table in self._tables:
+            for entry in table:
+                if entry is not None:
+                    key_array.append(entry[0])
+        for entry in self._stash:
+            key_array.append(entry[0])
+        return key_array
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    import time
+
+    from hash_map import HashMap, hash_function_1
+
+    print("\nput / get example")
+    print("-----------------")
+    m = CuckooHashMap(10, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.size,
+                  m.capacity)
+    print(m.get('str42'), m.get('str150'), m.contains_key('str149'))
+
+    print("\nget() tail latency in nanoseconds (hash_function_1, "
+          "50000 keys)")
+    print("------------------------------------------------------------")
+
+    def percentile(samples, fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    keys = ['key' + str(i) for i in range(50000)]
+    misses = ['miss' + str(i) for i in range(50000)]
+    for name, m in (('HashMap', HashMap(1024, hash_function_1)),
+                    ('CuckooHashMap', CuckooHashMap(1024, hash_function_1))):
+        for key in keys:
+            m.put(key, key)
+        for label, lookups in (('hits', keys), ('misses', misses)):
+            samples = []
+            clock = time.perf_counter_ns
+            for key in lookups:
+                start = clock()
+                m.get(key)
+                samples.append(clock() - start)
+            samples.sort()
+            print('{:14} {:6}  p50 {:7}  p99 {:7}  p99.9 {:7}  max {:8}'
+                  .format(name, label, percentile(samples, 0.5),
+                          percentile(samples, 0.99),
+                          percentile(samples, 0.999), samples[-1]))
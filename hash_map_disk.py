@@ -0,0 +1,571 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Persistent On-Disk Hash Map
+# Description: Defines a separate chaining Hash Map ADT whose buckets and
+#              entries live in a memory-mapped file instead of the Python
+#              heap. Opening an existing file is near-instant because nothing
+#              is rebuilt, the operating system only pages in the buckets and
+#              chains that are actually used, and any number of processes can
+#              open the same file read-only and share one copy of its pages.
+#              A replaced value is overwritten in place when the new one fits,
+#              and once dead entries and old bucket arrays take up most of
+#              the file, compact() rewrites it with only the live entries.
+#
+#              File layout (all integers little-endian):
+#                header  -- magic, version, capacity, size, offset of the
+#                           bucket array, offset of the first free byte,
+#                           number of dead bytes before it
+#                buckets -- capacity 8-byte offsets of each chain's first
+#                           entry (0 for an empty bucket)
+#                entries -- offset of the next entry in the chain, full hash
+#                           of the key, key length, value length, UTF-8 key
+#                           bytes, pickled value bytes
+
+
+import mmap
+import os
+import pickle
+import struct
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+from hash_functions import fnv1a
+from hash_map import HashMapException
+
+
+_MAGIC = b'CS261HMD'
+_VERSION = 2
+
+# magic, version, reserved, capacity, size, buckets offset, end offset,
+# dead bytes
+_HEADER = struct.Struct('<8sIIQQQQQ')
+# next entry offset, key hash, key length, value length
+_ENTRY = struct.Struct('<QQII')
+_OFFSET = struct.Struct('<Q')
+
+_MASK_64 = 0xffffffffffffffff
+
+
+class DiskHashMap:
+    # Load factor above which put() doubles the number of buckets
+    max_load_factor = 1.0
+    # Fraction of the used part of the file that may be dead bytes (replaced
+    # or removed entries and old bucket arrays) before put() and remove()
+    # compact the file, and the fewest dead bytes worth compacting for
+    max_dead_fraction = 0.5
+    min_compact_bytes = 1 << 16
+
+    def __init__(self, path: str, capacity: int = 1024, function=fnv1a,
+                 readonly: bool = False) -> None:
+        """
+        Opens the hash map stored in the file at the specified path, or
+        creates a new one with the specified capacity if the file does not
+        exist.
+
+        The hash function must give the same result in every process (so not
+        builtin_hash) and must be the same one the file was created with.
+        Values are stored pickled, so only open files from trusted sources.
+        """
+        self.path = path
+        self.hash_function = function
+        self.readonly = readonly
+
+        # Creates a new file holding just the header and an empty bucket array
+        if not os.path.exists(path):
+            if readonly:
+                raise HashMapException('no hash map file at ' + path)
+            capacity = max(capacity, 1)
+            buckets_offset = _HEADER.size
+            end_offset = buckets_offset + capacity * _OFFSET.size
+            with open(path, 'wb') as new_file:
+                new_file.write(_HEADER.pack(_MAGIC, _VERSION, 0, capacity, 0,
+                                            buckets_offset, end_offset, 0))
+                new_file.write(bytes(capacity * _OFFSET.size))
+
+        self._file = open(path, 'rb' if readonly else 'r+b')
+
+        # An empty or cut off file cannot be mapped or hold a header
+        if os.fstat(self._file.fileno()).st_size < _HEADER.size:
+            self._file.close()
+            raise HashMapException(path + ' is not a hash map file')
+        self._map()
+
+        magic, version, _, capacity, size, buckets_offset, end_offset, \
+            dead_bytes = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise HashMapException(path + ' is not a version ' +
+                                   str(_VERSION) + ' hash map file')
+
+        self.capacity = capacity
+        self.size = size
+        self._buckets_offset = buckets_offset
+        self._end_offset = end_offset
+        self._dead_bytes = dead_bytes
+
+    def __str__(self) -> str:
+        """
+        Return content of hash map in human-readable form
+        """
+        out = ''
+        for i in range(self.capacity):
+            pairs = []
+            offset = self._bucket_head(i)
+            while offset != 0:
+                next_offset, _, key_length, value_length = \
+                    _ENTRY.unpack_from(self._mm, offset)
+                pairs.append('(' + str(self._read_key(offset, key_length)) +
+                             ': ' + str(self._read_value(
+                                 offset, key_length, value_length)) + ')')
+                offset = next_offset
+            out += str(i) + ': SLL [' + ' -> '.join(pairs) + ']\n'
+        return out
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _map(self) -> None:
+        """
+        Used internally to memory-map the whole file.
+        """
+        access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=access)
+
+    def flush(self) -> None:
+        """
+        Writes any changes still in memory out to the file.
+        """
+        if not self.readonly:
+            self._mm.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the file. The hash map cannot be used afterwards.
+        """
+        if self._mm is not None:
+            self.flush()
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def _check_writable(self) -> None:
+        """
+        Used internally to refuse changes to a read-only hash map.
+        """
+        if self.readonly:
+            raise HashMapException('hash map was opened read-only')
+
+    def _write_header(self) -> None:
+        """
+        Used internally to save the size, capacity, offsets and dead byte
+        count to the header.
+        """
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, 0, self.capacity,
+                          self.size, self._buckets_offset, self._end_offset,
+                          self._dead_bytes)
+
+    def _save(self) -> None:
+        """
+        Used internally after every change to compact the file if most of its
+        used part is dead bytes, or otherwise to save the header.
+        """
+        if self._dead_bytes >= self.min_compact_bytes and \
+                self._dead_bytes > self._end_offset * self.max_dead_fraction:
+            self.compact()
+        else:
+            self._write_header()
+
+    def _allocate(self, length: int) -> int:
+        """
+        Used internally to reserve the specified number of bytes at the end
+        of the used part of the file, growing the file geometrically when it
+        runs out of room.
+
+        Returns the offset of the reserved bytes.
+        """
+        offset = self._end_offset
+        needed = offset + length
+
+        # Doubles the file (at least) and maps it again
+        if needed > len(self._mm):
+            new_length = max(needed, len(self._mm) * 2)
+            self._mm.close()
+            self._file.truncate(new_length)
+            self._map()
+
+        self._end_offset = needed
+        return offset
+
+    def _bucket_head(self, index: int) -> int:
+        """
+        Used internally to get the offset of the first entry in a bucket.
+        """
+        return _OFFSET.unpack_from(
+            self._mm, self._buckets_offset + index * _OFFSET.size)[0]
+
+    def _set_bucket_head(self, index: int, offset: int) -> None:
+        """
+        Used internally to set the offset of the first entry in a bucket.
+        """
+        _OFFSET.pack_into(self._mm,
+                          self._buckets_offset + index * _OFFSET.size, offset)
+
+    def _read_key(self, offset: int, key_length: int) -> str:
+        """
+        Used internally to read the key of the entry at an offset.
+        """
+        start = offset + _ENTRY.size
+        return self._mm[start:start + key_length].decode('utf-8')
+
+    def _read_value(self, offset: int, key_length: int,
+                    value_length: int) -> object:
+        """
+        Used internally to read the value of the entry at an offset.
+        """
+        start = offset + _ENTRY.size + key_length
+        return pickle.loads(self._mm[start:start + value_length])
+
+    def _find_entry(self, key_bytes: bytes, key_hash: int):
+        """
+        Used internally to find the entry holding a key.
+
+        Returns a tuple of the entry's offset, the offset of the entry before
+        it in the chain (0 if it is first) and its key and value lengths.
+        Otherwise, if the key is not in the hash map, returns None.
+        """
+        mm = self._mm
+        previous = 0
+        offset = self._bucket_head(key_hash % self.capacity)
+
+        while offset != 0:
+            next_offset, entry_hash, key_length, value_length = \
+                _ENTRY.unpack_from(mm, offset)
+            # Compares the stored hash first, then the key bytes in place
+            if entry_hash == key_hash and key_length == len(key_bytes):
+                start = offset + _ENTRY.size
+                if mm[start:start + key_length] == key_bytes:
+                    return offset, previous, key_length, value_length
+            previous = offset
+            offset = next_offset
+
+        return None
+
+    def _unlink(self, key_hash: int, offset: int, previous: int,
+                replacement: int) -> None:
+        """
+        Used internally to replace the entry at an offset in its chain with
+        another entry (or with the rest of the chain if replacement is 0).
+        """
+        if replacement == 0:
+            replacement = _OFFSET.unpack_from(self._mm, offset)[0]
+
+        if previous == 0:
+            self._set_bucket_head(key_hash % self.capacity, replacement)
+        else:
+            _OFFSET.pack_into(self._mm, previous, replacement)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of a hash map and reclaims the space used by its
+        entries.
+
+        Does not change capacity.
+        """
+        self._check_writable()
+        bucket_bytes = self.capacity * _OFFSET.size
+        self._mm[self._buckets_offset:self._buckets_offset + bucket_bytes] = \
+            bytes(bucket_bytes)
+        self.size = 0
+        # Entries after the bucket array are no longer reachable. Any old
+        # bucket arrays before it stay dead until the next compact().
+        self._end_offset = self._buckets_offset + bucket_bytes
+        self._dead_bytes = self._buckets_offset - _HEADER.size
+        self._write_header()
+
+    def get(self, key: str) -> object:
+        """
+        Takes a key to search for in a hash map.
+
+        Returns the object associated with the specified key.
+
+        Otherwise, if the key is not in the hash map, returns None.
+        """
+        if self.size == 0:
+            return None
+
+        found = self._find_entry(key.encode('utf-8'),
+                                 self.hash_function(key) & _MASK_64)
+        if found is None:
+            return None
+
+        offset, _, key_length, value_length = found
+        return self._read_value(offset, key_length, value_length)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Takes a key and an object to pair with the key and puts it in a hash
+        map.
+
+        If the key is already associated with a paired object, it replaces the
+        key's current object with the new object.
+
+        Otherwise, inserts the key/object pair into the hash map.
+
+        A replaced value is overwritten in place if the new one is no longer.
+        Otherwise, a new entry is appended and the old one becomes dead bytes,
+        reclaimed by the next compaction.
+        """
+        self._check_writable()
+
+        key_bytes = key.encode('utf-8')
+        value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        key_hash = self.hash_function(key) & _MASK_64
+        found = self._find_entry(key_bytes, key_hash)
+
+        # If the new value fits in the old one's place, overwrites it there;
+        # any bytes it does not use are dead
+        if found is not None and len(value_bytes) <= found[3]:
+            old_offset, _, key_length, value_length = found
+            start = old_offset + _ENTRY.size + key_length
+            self._mm[start:start + len(value_bytes)] = value_bytes
+            next_offset = _OFFSET.unpack_from(self._mm, old_offset)[0]
+            _ENTRY.pack_into(self._mm, old_offset, next_offset, key_hash,
+                             key_length, len(value_bytes))
+            self._dead_bytes += value_length - len(value_bytes)
+            self._save()
+            return
+
+        # Writes the new entry at the end of the file. Allocating can remap
+        # the file, so chain offsets are only written afterwards.
+        offset = self._allocate(_ENTRY.size + len(key_bytes) +
+                                len(value_bytes))
+        start = offset + _ENTRY.size
+        self._mm[start:start + len(key_bytes)] = key_bytes
+        start += len(key_bytes)
+        self._mm[start:start + len(value_bytes)] = value_bytes
+
+        # If the key is already in the hash map, the new entry takes the old
+        # one's place in the chain
+        if found is not None:
+            old_offset, previous, key_length, value_length = found
+            next_offset = _OFFSET.unpack_from(self._mm, old_offset)[0]
+            _ENTRY.pack_into(self._mm, offset, next_offset, key_hash,
+                             len(key_bytes), len(value_bytes))
+            self._unlink(key_hash, old_offset, previous, offset)
+            self._dead_bytes += _ENTRY.size + key_length + value_length
+            self._save()
+            return
+
+        # Otherwise, the new entry becomes the head of its bucket's chain
+        index = key_hash % self.capacity
+        _ENTRY.pack_into(self._mm, offset, self._bucket_head(index),
+                         key_hash, len(key_bytes), len(value_bytes))
+        self._set_bucket_head(index, offset)
+        self.size += 1
+
+        # If the new pair pushed the load factor past the maximum, doubles the
+        # number of buckets
+        if self.size > self.capacity * self.max_load_factor:
+            self.resize_table(self.capacity * 2)
+        else:
+            self._save()
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+
+        If the specified key is not in the hash map, this does nothing.
+        """
+        self._check_writable()
+
+        if self.size == 0:
+            return
+
+        key_hash = self.hash_function(key) & _MASK_64
+        found = self._find_entry(key.encode('utf-8'), key_hash)
+        if found is None:
+            return
+
+        offset, previous, key_length, value_length = found
+        self._unlink(key_hash, offset, previous, 0)
+        self.size -= 1
+        self._dead_bytes += _ENTRY.size + key_length + value_length
+        self._save()
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks the hash map for a specified key.
+
+        Returns True if the key is in the hash map.
+        Otherwise, returns False.
+        """
+        if self.size == 0:
+            return False
+
+        return self._find_entry(key.encode('utf-8'),
+                                self.hash_function(key) & _MASK_64) is not None
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of empty buckets in a hash map.
+
+        Returns the total count.
+        """
+        counter = 0
+        for i in range(self.capacity):
+            if self._bucket_head(i) == 0:
+                counter += 1
+        return counter
+
+    def table_load(self) -> float:
+        """
+        Calculates the load factor of a hash map, which is the average
+        number of elements in each bucket.
+
+        Returns the load factor of the hash map.
+        """
+        return self.size / self.capacity
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes a hash table to a new specified capacity.
+
+        If the specified capacity is less than 1, does nothing.
+
+        Otherwise, writes a new bucket array at the end of the file and
+        relinks every entry into it using the hash stored in the entry, so
+        no key is read or hashed again. Entries themselves do not move, and
+        the old bucket array becomes dead bytes.
+        """
+        self._check_writable()
+
+        if new_capacity < 1:
+            return
+
+        new_buckets = self._allocate(new_capacity * _OFFSET.size)
+        mm = self._mm
+        mm[new_buckets:new_buckets + new_capacity * _OFFSET.size] = \
+            bytes(new_capacity * _OFFSET.size)
+
+        for i in range(self.capacity):
+            offset = self._bucket_head(i)
+            while offset != 0:
+                next_offset, key_hash, _, _ = _ENTRY.unpack_from(mm, offset)
+                # Pushes the entry onto the front of its new chain
+                head_position = new_buckets + \
+                    (key_hash % new_capacity) * _OFFSET.size
+                _OFFSET.pack_into(mm, offset,
+                                  _OFFSET.unpack_from(mm, head_position)[0])
+                _OFFSET.pack_into(mm, head_position, offset)
+                offset = next_offset
+
+        self._dead_bytes += self.capacity * _OFFSET.size
+        self._buckets_offset = new_buckets
+        self.capacity = new_capacity
+        self._save()
+
+    def compact(self) -> None:
+        """
+        Rewrites the file with a bucket array of the same capacity followed
+        by only the live entries, each chain's entries side by side, which
+        reclaims the space of replaced and removed entries and of old bucket
+        arrays.
+
+        The new file is written next to the old one and then moved over it,
+        so the hash map file is never left half rewritten. Processes that
+        still have the old file open keep seeing its old contents.
+        """
+        self._check_writable()
+
+        mm = self._mm
+        capacity = self.capacity
+        buckets_offset = _HEADER.size
+        end_offset = buckets_offset + capacity * _OFFSET.size
+        heads = [0] * capacity
+        compact_path = self.path + '.compact'
+
+        with open(compact_path, 'wb') as new_file:
+            # Writes the entries first, since the bucket array needs their
+            # new offsets
+            new_file.seek(end_offset)
+            for i in range(capacity):
+                offset = self._bucket_head(i)
+                if offset != 0:
+                    heads[i] = end_offset
+                while offset != 0:
+                    next_offset, key_hash, key_length, value_length = \
+                        _ENTRY.unpack_from(mm, offset)
+                    length = _ENTRY.size + key_length + value_length
+                    # The rest of the chain is written right after the entry
+                    new_file.write(_ENTRY.pack(
+                        end_offset + length if next_offset != 0 else 0,
+                        key_hash, key_length, value_length))
+                    new_file.write(mm[offset + _ENTRY.size:offset + length])
+                    end_offset += length
+                    offset = next_offset
+
+            new_file.seek(0)
+            new_file.write(_HEADER.pack(_MAGIC, _VERSION, 0, capacity,
+                                        self.size, buckets_offset, end_offset,
+                                        0))
+            new_file.write(struct.pack('<' + str(capacity) + 'Q', *heads))
+
+        # Swaps the compacted file in and maps it instead of the old one
+        self._mm.close()
+        self._mm = None
+        self._file.close()
+        os.replace(compact_path, self.path)
+        self._file = open(self.path, 'r+b')
+        self._map()
+
+        self._buckets_offset = buckets_offset
+        self._end_offset = end_offset
+        self._dead_bytes = 0
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a Dynamic Array containing all keys stored in a hash map.
+        """
+        key_array = DynamicArray()
+        for i in range(self.capacity):
+            offset = self._bucket_head(i)
+            while offset != 0:
+                next_offset, _, key_length, _ = \
+                    _ENTRY.unpack_from(self._mm, offset)
+                key_array.append(self._read_key(offset, key_length))
+                offset = next_offset
+        return key_array
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    import tempfile
+
+    print("\nput / reopen example")
+    print("--------------------")
+    path = os.path.join(tempfile.mkdtemp(), 'example.hmd')
+    with DiskHashMap(path, 10) as m:
+        for i in range(100):
+            m.put('key' + str(i), [i, i * 100])
+        m.remove('key7')
+        m.put('key8', 'replaced')
+        print(m.size, m.capacity, round(m.table_load(), 2))
+
+    with DiskHashMap(path, readonly=True) as m:
+        print(m.size, m.capacity, m.get('key42'), m.get('key7'),
+              m.get('key8'), m.contains_key('key99'))
+        print(os.path.getsize(path), 'bytes on disk')
+
+    print("\nrepeated update / compact example")
+    print("---------------------------------")
+    with DiskHashMap(path) as m:
+        for i in range(20000):
+            m.put('key' + str(i % 100), 'value' * (i % 7))
+        print(m.size, m.get('key5'), os.path.getsize(path), 'bytes on disk')
+        m.compact()
+        print(m.size, m.get('key5'), os.path.getsize(path), 'bytes on disk')
@@ -0,0 +1,302 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Frozen Hash Map
+# Description: Defines an immutable, read-optimized Hash Map built once from
+#              the pairs of a finished map (see HashMap.freeze()). Keys are
+#              placed with a minimal perfect hash (hash and displace): keys
+#              are grouped into small buckets, and each bucket stores one
+#              displacement that sends all of its keys to distinct slots, so
+#              n keys fill exactly n slots and every lookup reads one
+#              displacement and compares one key. Keys and values are kept in
+#              two flat tuples with no links or empty slots, which uses far
+#              less memory than the HashMap, and since nothing is ever changed
+#              the map can be shared between threads without locks.
+
+
+from array import array
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+
+_MASK_64 = 0xffffffffffffffff
+
+# Odd 64-bit multipliers that scramble a key's hash into a bucket and a slot
+_BUCKET_MULTIPLIER = 0x9e3779b97f4a7c15
+_SLOT_MULTIPLIER = 0xbf58476d1ce4e5b9
+
+# Average number of keys per displacement bucket
+_KEYS_PER_BUCKET = 2
+
+# Fills the only slot of an empty frozen map; equal to no key
+_EMPTY = object()
+
+
+class _Collisions:
+    """
+    Keys whose built-in hashes are identical, which no displacement can
+    separate, stored together in a single slot
+    """
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, keys: tuple, values: tuple) -> None:
+        self.keys = keys
+        self.values = values
+
+
+class FrozenHashMap:
+    __slots__ = ('size', 'capacity', '_bucket_count', '_displacements',
+                 '_keys', '_values')
+
+    def __init__(self, pairs) -> None:
+        """
+        Init new FrozenHashMap holding every (key, object) pair of the
+        specified iterable. If a key appears more than once, its last object
+        is kept.
+
+        Keys are placed by their built-in hash, which is computed in C and
+        cached for str keys, rather than by the hash function of the map they
+        came from.
+        """
+        # Groups the pairs by scrambled hash, merging repeated keys
+        groups = {}
+        for key, value in pairs:
+            code = self._code(key)
+            group = groups.get(code)
+            if group is None:
+                groups[code] = [(key, value)]
+                continue
+            for i in range(len(group)):
+                if group[i][0] == key:
+                    group[i] = (key, value)
+                    break
+            else:
+                group.append((key, value))
+
+        codes = list(groups)
+        capacity = max(len(codes), 1)
+        bucket_count = max(len(codes) // _KEYS_PER_BUCKET, 1)
+
+        # Splits the codes into displacement buckets
+        buckets = [[] for _ in range(bucket_count)]
+        for code in codes:
+            buckets[code % bucket_count].append(code)
+
+        # Places the largest buckets first, while most slots are still free
+        order = sorted(range(bucket_count), key=lambda b: -len(buckets[b]))
+        displacements = array('q', bytes(8 * bucket_count))
+        taken = bytearray(capacity)
+        slots = {}
+        # Singleton buckets come last, so free slots are handed out in order
+        next_free = 0
+
+        for b in order:
+            bucket = buckets[b]
+            if len(bucket) == 0:
+                break
+
+            # A bucket with one code takes any free slot directly; its
+            # displacement stores the slot itself, as a negative number
+            if len(bucket) == 1:
+                slot = taken.index(0, next_free)
+                next_free = slot + 1
+                taken[slot] = 1
+                slots[bucket[0]] = slot
+                displacements[b] = ~slot
+                continue
+
+            # Otherwise, tries displacements until every code of the bucket
+            # lands on a different free slot
+            displacement = 0
+            while True:
+                found = []
+                for code in bucket:
+                    slot = self._slot(code, displacement, capacity)
+                    # Gives up on this displacement at the first clash
+                    if taken[slot] or slot in found:
+                        break
+                    found.append(slot)
+                else:
+                    break
+                displacement += 1
+
+            for code, slot in zip(bucket, found):
+                taken[slot] = 1
+                slots[code] = slot
+            displacements[b] = displacement
+
+        keys = [_EMPTY] * capacity
+        values = [None] * capacity
+        for code in codes:
+            group = groups[code]
+            slot = slots[code]
+            if len(group) == 1:
+                keys[slot], values[slot] = group[0]
+            else:
+                keys[slot] = _Collisions(tuple(pair[0] for pair in group),
+                                         tuple(pair[1] for pair in group))
+
+        self.size = sum(len(group) for group in groups.values())
+        self.capacity = capacity
+        self._bucket_count = bucket_count
+        self._displacements = displacements
+        self._keys = tuple(keys)
+        self._values = tuple(values)
+
+    def __str__(self) -> str:
+        """
+        Return content of hash map in human-readable form
+        """
+        out = ''
+        for key, value in self.items():
+            out += str(key) + ': ' + str(value) + '\n'
+        return out
+
+    @staticmethod
+    def _code(key) -> int:
+        """
+        Used internally to scramble a key's built-in hash.
+        """
+        code = (hash(key) * _BUCKET_MULTIPLIER) & _MASK_64
+        return code ^ (code >> 32)
+
+    @staticmethod
+    def _slot(code: int, displacement: int, capacity: int) -> int:
+        """
+        Used internally to find the slot a displacement sends a code to.
+        """
+        return ((((code ^ displacement) * _SLOT_MULTIPLIER) & _MASK_64)
+                >> 32) % capacity
+
+    def _find_slot(self, key) -> int:
+        """
+        Used internally to find the only slot that can hold a key.
+        """
+        code = (hash(key) * _BUCKET_MULTIPLIER) & _MASK_64
+        code ^= code >> 32
+        displacement = self._displacements[code % self._bucket_count]
+        if displacement < 0:
+            return ~displacement
+        return ((((code ^ displacement) * _SLOT_MULTIPLIER) & _MASK_64)
+                >> 32) % self.capacity
+
+    def get(self, key) -> object:
+        """
+        Takes a key to search for in a hash map.
+
+        Returns the object associated with the specified key.
+
+        Otherwise, if the key is not in the hash map, returns None.
+        """
+        slot = self._find_slot(key)
+        found = self._keys[slot]
+        if found is key or found == key:
+            return self._values[slot]
+
+        # Keys sharing a built-in hash are searched one by one
+        if type(found) is _Collisions:
+            for i in range(len(found.keys)):
+                if found.keys[i] == key:
+                    return found.values[i]
+        return None
+
+    def contains_key(self, key) -> bool:
+        """
+        Checks the hash map for a specified key.
+
+        Returns True if the key is in the hash map.
+        Otherwise, returns False.
+        """
+        found = self._keys[self._find_slot(key)]
+        if found is key or found == key:
+            return True
+        return type(found) is _Collisions and key in found.keys
+
+    def table_load(self) -> float:
+        """
+        Calculates the load factor of a hash map. Every slot of a non-empty
+        frozen map holds a key, so this is 1.0 unless keys share a hash.
+
+        Returns the load factor of the hash map.
+        """
+        return self.size / self.capacity
+
+    def items(self):
+        """
+        Generates a (key, object) tuple for every pair stored in the hash map.
+        """
+        for slot in range(self.capacity):
+            key = self._keys[slot]
+            if type(key) is _Collisions:
+                for i in range(len(key.keys)):
+                    yield key.keys[i], key.values[i]
+            elif key is not _EMPTY:
+                yield key, self._values[slot]
+
+    def keys(self):
+        """
+        Generates every key stored in the hash map.
+        """
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """
+        Generates every object stored in the hash map.
+        """
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """
+        Generates every key stored in the hash map.
+        """
+        return self.keys()
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a Dynamic Array containing all keys stored in a hash map.
+        """
+        key_array = DynamicArray()
+        for key in self.keys():
+            key_array.append(key)
+        return key_array
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    import time
+    import tracemalloc
+
+    from hash_map import HashMap, hash_function_2
+
+    print("\nfreeze example")
+    print("--------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(10):
+        m.put('str' + str(i), i * 100)
+    f = m.freeze()
+    m.put('str10', 1000)
+    print(f.size, f.capacity, f.get('str4'), f.get('str10'),
+          f.contains_key('str9'), m.size)
+
+    print("\nget() time and memory, 20000 keys")
+    print("----------------------------------")
+    keys = ['key' + str(i) for i in range(20000)]
+
+    tracemalloc.start()
+    m = HashMap(1024, hash_function_2)
+    for key in keys:
+        m.put(key, key)
+    map_bytes = tracemalloc.get_traced_memory()[0]
+    f = m.freeze()
+    frozen_bytes = tracemalloc.get_traced_memory()[0] - map_bytes
+    tracemalloc.stop()
+
+    for name, lookup in (('HashMap', m), ('FrozenHashMap', f)):
+        start = time.perf_counter()
+        for key in keys:
+            lookup.get(key)
+        print('{:14} {:.3f}s'.format(name, time.perf_counter() - start))
+    print('bytes', map_bytes, frozen_bytes)
@@ -0,0 +1,330 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Open Addressing Hash Map
+# Description: Defines an open addressing Hash Map ADT with the same methods
+#              as the separate chaining HashMap. Keys, values and the full
+#              hash of each key are kept in three flat parallel arrays and
+#              collisions are resolved with linear probing, using tombstones
+#              to mark removed entries so probe sequences stay intact. Keys
+#              may be any hashable object except None, which marks empty
+#              slots.
+
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+
+# Marks a slot whose entry was removed. Probing continues past tombstones but
+# put() may reuse them.
+_TOMBSTONE = object()
+
+
+class OpenAddressHashMap:
+    # Load factor (counting tombstones) above which put() grows the table.
+    # Linear probing degrades quickly past roughly 0.7.
+    max_load_factor = 0.5
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Init new OpenAddressHashMap based on three parallel arrays of slots
+        """
+        # The slot arrays are plain Python lists: every slot is a single
+        # reference, so there are no per-entry node objects to allocate
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = [0] * capacity
+        self.capacity = capacity
+        self.hash_function = function
+        self.size = 0
+        # Number of slots currently holding a tombstone
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Return content of hash map in human-readable form
+        """
+        out = ''
+        for i in range(self.capacity):
+            key = self._keys[i]
+            if key is None:
+                out += str(i) + ': None\n'
+            elif key is _TOMBSTONE:
+                out += str(i) + ': TS\n'
+            else:
+                out += str(i) + ': ' + str(key) + ': ' + \
+                    str(self._values[i]) + '\n'
+        return out
+
+    def _find_slot(self, key, key_hash) -> int:
+        """
+        Used internally to probe for a key.
+
+        Returns the index of the slot holding the key if it is found.
+        Otherwise, returns -1.
+        """
+        keys = self._keys
+        hashes = self._hashes
+        capacity = self.capacity
+        index = key_hash % capacity
+
+        # Probes linearly until an empty slot ends the probe sequence. The
+        # load factor bound guarantees at least one empty slot exists.
+        while True:
+            slot_key = keys[index]
+            # An empty slot means the key was never placed past this point
+            if slot_key is None:
+                return -1
+            # Compares the cached hashes first so most mismatches skip the
+            # (possibly expensive) key comparison. Tombstones never match
+            # because they are not equal to any key.
+            if hashes[index] == key_hash and slot_key is not _TOMBSTONE and \
+                    (slot_key is key or slot_key == key):
+                return index
+            # Moves to the next slot, wrapping around the end of the table
+            index += 1
+            if index == capacity:
+                index = 0
+
+    def clear(self) -> None:
+        """
+        Clears the contents of a hash map.
+
+        Does not change capacity.
+        """
+        self._keys = [None] * self.capacity
+        self._values = [None] * self.capacity
+        self._hashes = [0] * self.capacity
+        self.size = 0
+        self._tombstones = 0
+
+    def get(self, key: object) -> object:
+        """
+        Takes a key to search for in a hash map.
+
+        Returns the object associated with the specified key.
+
+        Otherwise, if the key is not in the hash map, returns None.
+        """
+        # If the hash map is empty
+        if self.size == 0:
+            return None
+
+        index = self._find_slot(key, self.hash_function(key))
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Takes a key and an object to pair with the key and puts it in a hash
+        map.
+
+        If the key is already associated with a paired object, it replaces the
+        key's current object with the new object.
+
+        Otherwise, inserts the key/object pair into the hash map, growing the
+        table first if the new pair would push the load factor past the
+        maximum.
+        """
+        # Grows (or purges tombstones from) the table before probing so the
+        # probe sequence below is guaranteed to reach an empty slot. A table
+        # that is mostly live pairs doubles; one that is mostly tombstones
+        # keeps its capacity and is only purged, which leaves it at most half
+        # of the maximum load, so rebuilds stay amortized O(1) even under
+        # remove/put churn. Tiny tables double until the new pair fits too.
+        if self.size + self._tombstones + 1 > \
+                self.capacity * self.max_load_factor:
+            new_capacity = max(self.capacity, 1)
+            while self.size > new_capacity * self.max_load_factor / 2 or \
+                    self.size + 1 > new_capacity * self.max_load_factor:
+                new_capacity *= 2
+            self.resize_table(new_capacity)
+
+        key_hash = self.hash_function(key)
+        keys = self._keys
+        hashes = self._hashes
+        capacity = self.capacity
+        index = key_hash % capacity
+        # Remembers the first tombstone passed so the new pair can reuse it
+        reuse_index = -1
+
+        while True:
+            slot_key = keys[index]
+
+            # Reached the end of the probe sequence without finding the key
+            if slot_key is None:
+                break
+
+            if slot_key is _TOMBSTONE:
+                if reuse_index == -1:
+                    reuse_index = index
+
+            # If the key is already in the hash map, replaces its value
+            elif hashes[index] == key_hash and \
+                    (slot_key is key or slot_key == key):
+                self._values[index] = value
+                return
+
+            index += 1
+            if index == capacity:
+                index = 0
+
+        # Inserts the new pair into the first tombstone passed, if any,
+        # otherwise into the empty slot that ended the probe sequence
+        if reuse_index != -1:
+            index = reuse_index
+            self._tombstones -= 1
+
+        keys[index] = key
+        self._values[index] = value
+        hashes[index] = key_hash
+        self.size += 1
+
+    def remove(self, key: object) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+
+        If the specified key is not in the hash map, this does nothing.
+        """
+        # If the hash map is empty, does nothing
+        if self.size == 0:
+            return
+
+        index = self._find_slot(key, self.hash_function(key))
+        if index == -1:
+            return
+
+        # Leaves a tombstone behind so later keys in the same probe sequence
+        # can still be found
+        self._keys[index] = _TOMBSTONE
+        self._values[index] = None
+        self.size -= 1
+        self._tombstones += 1
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Checks the hash map for a specified key.
+
+        Returns True if the key is in the hash map.
+        Otherwise, returns False.
+        """
+        # If the hash map is empty
+        if self.size == 0:
+            return False
+
+        return self._find_slot(key, self.hash_function(key)) != -1
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of slots in a hash map that do not hold a key/value
+        pair (tombstones count as empty).
+
+        Returns the total count.
+        """
+        return self.capacity - self.size
+
+    def table_load(self) -> float:
+        """
+        Calculates the load factor of a hash map, which is the fraction of
+        slots holding a key/value pair.
+
+        Returns the load factor of the hash map.
+        """
+        return self.size / self.capacity
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes a hash table to a new specified capacity.
+
+        If the specified capacity could not hold every key/object pair plus at
+        least one empty slot, does nothing.
+
+        Otherwise, moves every pair into new slot arrays of the specified
+        capacity using the cached hashes, so the hash function is never
+        called again. Tombstones are dropped along the way.
+        """
+        # Open addressing needs at least one empty slot to end probing
+        if new_capacity < 1 or new_capacity <= self.size:
+            return
+
+        old_keys = self._keys
+        old_values = self._values
+        old_hashes = self._hashes
+
+        new_keys = [None] * new_capacity
+        new_values = [None] * new_capacity
+        new_hashes = [0] * new_capacity
+
+        for i in range(self.capacity):
+            key = old_keys[i]
+            # Skips empty slots and tombstones
+            if key is None or key is _TOMBSTONE:
+                continue
+
+            # Probes for the first empty slot in the new arrays. No key can
+            # already be there, so no comparisons are needed.
+            key_hash = old_hashes[i]
+            index = key_hash % new_capacity
+            while new_keys[index] is not None:
+                index += 1
+                if index == new_capacity:
+                    index = 0
+
+            new_keys[index] = key
+            new_values[index] = old_values[i]
+            new_hashes[index] = key_hash
+
+        self._keys = new_keys
+        self._values = new_values
+        self._hashes = new_hashes
+        self.capacity = new_capacity
+        self._tombstones = 0
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a Dynamic Array containing all keys stored in a hash map.
+        """
+        key_array = DynamicArray()
+        for key in self._keys:
+            if key is not None and key is not _TOMBSTONE:
+                key_array.append(key)
+        return key_array
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    from hash_map import hash_function_1, hash_function_2
+
+    print("\nput / get example")
+    print("-----------------")
+    m = OpenAddressHashMap(10, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.size,
+                  m.capacity)
+    print(m.get('str42'), m.get('str150'))
+
+    print("\nremove / contains_key example")
+    print("-----------------------------")
+    m = OpenAddressHashMap(75, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for key in keys[::2]:
+        m.remove(str(key))
+    result = True
+    for i, key in enumerate(keys):
+        result &= m.contains_key(str(key)) == (i % 2 == 1)
+        result &= not m.contains_key(str(key + 1))
+    print(result, m.size, m.capacity)
+
+    print("\nget_keys example")
+    print("----------------")
+    m = OpenAddressHashMap(10, hash_function_2)
+    for i in range(100, 200, 10):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys())
+    m.resize_table(11)
+    print(m.get_keys())
@@ -0,0 +1,387 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Ordered Hash Map
+# Description: Defines an insertion-ordered Hash Map ADT with the same methods
+#              as the separate chaining HashMap. Pairs are appended to a
+#              compact entries array (three parallel lists of keys, values and
+#              cached hashes) in the order they were first put, and a separate
+#              index table, probed linearly, maps each key's hash to its
+#              position in the entries array. get_keys() and the iterators
+#              walk the entries array, so keys always come back in insertion
+#              order, no matter how often the table is resized. The index
+#              table stores small integers in the narrowest array type that
+#              fits, so the whole map takes much less memory than chains of
+#              linked list nodes.
+
+
+from array import array
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+from hash_map import HashMapException
+
+
+# Index table slot that has never held an entry; ends probe sequences
+_EMPTY = -1
+# Index table slot whose entry was removed; probing continues past it
+_DUMMY = -2
+
+# Takes the place of a removed entry's key in the entries array
+_DELETED = object()
+
+
+def _new_index(capacity: int) -> array:
+    """
+    Used internally to create an index table of the specified capacity with
+    every slot empty, using the narrowest signed integer type that can hold
+    any entry position.
+    """
+    for typecode in ('b', 'h', 'i', 'q'):
+        if capacity < 1 << (8 * array(typecode).itemsize - 1):
+            break
+    return array(typecode, [_EMPTY]) * capacity
+
+
+class OrderedHashMap:
+    # Fraction of index slots (counting removed entries not yet compacted)
+    # that may be used before put() grows the table
+    max_load_factor = 2 / 3
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Init new OrderedHashMap with an index table of the specified capacity
+        and an empty entries array
+        """
+        self._index = _new_index(capacity)
+        # The entries array, in insertion order. Removed entries keep their
+        # place, with _DELETED as their key, until the next compaction.
+        self._keys = []
+        self._values = []
+        self._hashes = []
+        self.capacity = capacity
+        self.hash_function = function
+        self.size = 0
+        # Counts changes to which keys are stored or where, so iterators can
+        # detect the hash map being modified while they run
+        self._mod_count = 0
+
+    def __str__(self) -> str:
+        """
+        Return content of hash map in human-readable form
+        """
+        out = ''
+        for key, value in self.items():
+            out += str(key) + ': ' + str(value) + '\n'
+        return out
+
+    def _find_slot(self, key, key_hash: int) -> int:
+        """
+        Used internally to probe the index table for a key.
+
+        Returns the index table slot pointing to the key's entry if the key
+        is found.
+        Otherwise, returns -1.
+        """
+        index = self._index
+        keys = self._keys
+        hashes = self._hashes
+        capacity = self.capacity
+        slot = key_hash % capacity
+
+        # The load factor bound guarantees an empty slot ends the probing
+        while True:
+            position = index[slot]
+            if position == _EMPTY:
+                return -1
+            # Compares the cached hashes first so most mismatches skip the
+            # key comparison; removed slots are skipped over
+            if position != _DUMMY and hashes[position] == key_hash:
+                entry_key = keys[position]
+                if entry_key is key or entry_key == key:
+                    return slot
+            slot += 1
+            if slot == capacity:
+                slot = 0
+
+    def clear(self) -> None:
+        """
+        Clears the contents of a hash map.
+
+        Does not change capacity.
+        """
+        self._index = _new_index(self.capacity)
+        self._keys = []
+        self._values = []
+        self._hashes = []
+        self.size = 0
+        self._mod_count += 1
+
+    def get(self, key: object) -> object:
+        """
+        Takes a key to search for in a hash map.
+
+        Returns the object associated with the specified key.
+
+        Otherwise, if the key is not in the hash map, returns None.
+        """
+        # If the hash map is empty
+        if self.size == 0:
+            return None
+
+        slot = self._find_slot(key, self.hash_function(key))
+        if slot == -1:
+            return None
+        return self._values[self._index[slot]]
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Takes a key and an object to pair with the key and puts it in a hash
+        map.
+
+        If the key is already associated with a paired object, it replaces the
+        key's current object with the new object, and the key keeps its place
+        in the insertion order.
+
+        Otherwise, appends the key/object pair to the end of the insertion
+        order, growing the table first if the new pair would push the load
+        factor past the maximum.
+        """
+        key_hash = self.hash_function(key)
+
+        if self.size > 0:
+            slot = self._find_slot(key, key_hash)
+            if slot != -1:
+                self._values[self._index[slot]] = value
+                return
+
+        # Every entry, removed or not, holds an index slot until compaction.
+        # When the index fills up, it doubles only while the live entries
+        # would still take more than half of the maximum load (or, in a tiny
+        # index, leave no slot for the new entry); otherwise the rebuild just
+        # compacts away the removed entries.
+        if len(self._keys) + 1 > self.capacity * self.max_load_factor:
+            new_capacity = max(self.capacity, 1)
+            while self.size > new_capacity * self.max_load_factor / 2 or \
+                    self.size + 1 > new_capacity * self.max_load_factor:
+                new_capacity *= 2
+            self.resize_table(new_capacity)
+
+        # Finds the first empty index slot of the key's probe sequence
+        index = self._index
+        capacity = self.capacity
+        slot = key_hash % capacity
+        while index[slot] != _EMPTY:
+            slot += 1
+            if slot == capacity:
+                slot = 0
+
+        index[slot] = len(self._keys)
+        self._keys.append(key)
+        self._values.append(value)
+        self._hashes.append(key_hash)
+        self.size += 1
+        self._mod_count += 1
+
+    def remove(self, key: object) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+
+        If the specified key is not in the hash map, this does nothing.
+        """
+        # If the hash map is empty, does nothing
+        if self.size == 0:
+            return
+
+        slot = self._find_slot(key, self.hash_function(key))
+        if slot == -1:
+            return
+
+        # Marks the entry removed in place, so the positions of the entries
+        # after it (and the insertion order) do not change
+        position = self._index[slot]
+        self._index[slot] = _DUMMY
+        self._keys[position] = _DELETED
+        self._values[position] = None
+        self.size -= 1
+        self._mod_count += 1
+
+        # Compacts the entries array once most of it is removed entries
+        if len(self._keys) > 2 * self.size + 8:
+            self.resize_table(self.capacity)
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Checks the hash map for a specified key.
+
+        Returns True if the key is in the hash map.
+        Otherwise, returns False.
+        """
+        # If the hash map is empty
+        if self.size == 0:
+            return False
+
+        return self._find_slot(key, self.hash_function(key)) != -1
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of index slots in a hash map that do not point to a
+        key/value pair (slots of removed pairs count as empty).
+
+        Returns the total count.
+        """
+        return self.capacity - self.size
+
+    def table_load(self) -> float:
+        """
+        Calculates the load factor of a hash map, which is the fraction of
+        index slots pointing to a key/value pair.
+
+        Returns the load factor of the hash map.
+        """
+        return self.size / self.capacity
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes a hash table to a new specified capacity.
+
+        If the specified capacity could not hold every key/object pair plus at
+        least one empty slot, does nothing.
+
+        Otherwise, compacts the entries array, dropping removed entries while
+        keeping the insertion order, and rebuilds the index table at the
+        specified capacity using the cached hashes, so the hash function is
+        never called again.
+        """
+        # Linear probing needs at least one empty slot to end probing
+        if new_capacity < 1 or new_capacity <= self.size:
+            return
+
+        # Compacts the entries array if any entries were removed
+        if len(self._keys) != self.size:
+            keep = [i for i in range(len(self._keys))
+                    if self._keys[i] is not _DELETED]
+            self._keys = [self._keys[i] for i in keep]
+            self._values = [self._values[i] for i in keep]
+            self._hashes = [self._hashes[i] for i in keep]
+
+        # Points a slot of the new index table at every entry. No key can
+        # already be there, so no comparisons are needed.
+        index = _new_index(new_capacity)
+        hashes = self._hashes
+        for position in range(self.size):
+            slot = hashes[position] % new_capacity
+            while index[slot] != _EMPTY:
+                slot += 1
+                if slot == new_capacity:
+                    slot = 0
+            index[slot] = position
+
+        self._index = index
+        self.capacity = new_capacity
+        self._mod_count += 1
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a Dynamic Array containing all keys stored in a hash map, in
+        the order they were first put.
+        """
+        key_array = DynamicArray()
+        for key in self.keys():
+            key_array.append(key)
+        return key_array
+
+    def _iter_positions(self):
+        """
+        Used internally to generate the entries array position of every pair
+        in insertion order.
+
+        Raises HashMapException if the hash map gains or loses a key, is
+        cleared or is resized while the generator is in use.
+        """
+        # Remembers the modification count to check it after every yield
+        mod_count = self._mod_count
+        keys = self._keys
+
+        for position in range(len(keys)):
+            if keys[position] is _DELETED:
+                continue
+            yield position
+            # Fails fast if the hash map changed while the position was out
+            if self._mod_count != mod_count:
+                raise HashMapException('hash map changed during iteration')
+
+    def keys(self):
+        """
+        Generates every key stored in the hash map, in insertion order.
+        """
+        for position in self._iter_positions():
+            yield self._keys[position]
+
+    def values(self):
+        """
+        Generates every object stored in the hash map, in insertion order of
+        their keys.
+        """
+        for position in self._iter_positions():
+            yield self._values[position]
+
+    def items(self):
+        """
+        Generates a (key, object) tuple for every pair stored in the hash map,
+        in insertion order.
+        """
+        for position in self._iter_positions():
+            yield self._keys[position], self._values[position]
+
+    def __iter__(self):
+        """
+        Generates every key stored in the hash map, in insertion order.
+        """
+        return self.keys()
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    import tracemalloc
+
+    from hash_functions import hash_generic
+    from hash_map import HashMap, hash_function_1, hash_function_2
+
+    print("\nget_keys example")
+    print("----------------")
+    m = OrderedHashMap(10, hash_function_2)
+    for i in range(100, 200, 10):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys())
+    m.resize_table(31)
+    print(m.get_keys())
+    m.put('200', '2000')
+    m.remove('100')
+    m.put('110', 'updated')
+    print(m.get_keys(), m.get('110'))
+
+    print("\nput / remove example")
+    print("--------------------")
+    m = OrderedHashMap(10, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.size,
+                  m.capacity)
+    for i in range(0, 150, 2):
+        m.remove('str' + str(i))
+    print(m.size, m.capacity, m.get('str41'), m.contains_key('str42'),
+          list(m.keys())[:5])
+
+    print("\nmemory for 20000 pairs in bytes")
+    print("-------------------------------")
+    for name, map_class in (('HashMap', HashMap),
+                            ('OrderedHashMap', OrderedHashMap)):
+        tracemalloc.start()
+        m = map_class(10, hash_generic)
+        for i in range(20000):
+            m.put(i, i)
+        print('{:15} {}'.format(name, tracemalloc.get_traced_memory()[0]))
+        tracemalloc.stop()
@@ -0,0 +1,318 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Sharded Hash Map
+# Description: Defines a Hash Map front end that partitions its keys across a
+#              number of local worker processes, each holding its own HashMap.
+#              Keys are assigned to shards by a partition hash, and requests
+#              travel over one pipe per worker as batches, so the batch
+#              methods split their keys by shard, send every shard its part
+#              before waiting on any reply, and let all workers run at once.
+
+
+import multiprocessing
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+from hash_functions import builtin_hash
+from hash_map import HashMap, HashMapException
+
+
+def _shard_worker(connection, capacity: int, function) -> None:
+    """
+    Used internally as the main loop of a shard's worker process.
+
+    Receives (command, arguments) requests over the connection, runs them on
+    the shard's HashMap and sends back ('ok', result) or ('error', message)
+    until it receives the 'close' command.
+    """
+    hash_map = HashMap(capacity, function)
+
+    def as_list(array):
+        return [array.get_at_index(i) for i in range(array.length())]
+
+    commands = {
+        'put_many': lambda keys, values: hash_map.put_many(keys, values),
+        'get_many': lambda keys: as_list(hash_map.get_many(keys)),
+        'remove_many': lambda keys: hash_map.remove_many(keys),
+        'contains_many': lambda keys: as_list(hash_map.contains_many(keys)),
+        'get_keys': lambda: as_list(hash_map.get_keys()),
+        'size': lambda: hash_map.size,
+        'clear': lambda: hash_map.clear(),
+    }
+
+    while True:
+        command, arguments = connection.recv()
+        if command == 'close':
+            connection.close()
+            return
+        try:
+            connection.send(('ok', commands[command](*arguments)))
+        except Exception as error:
+            connection.send(('error', repr(error)))
+
+
+class ShardedHashMap:
+    def __init__(self, shards: int, function, capacity: int = 1024,
+                 partition_function=builtin_hash) -> None:
+        """
+        Init new ShardedHashMap by starting the specified number of worker
+        processes, each with a HashMap of the specified capacity using the
+        specified hash function.
+
+        The hash function must be picklable (a module-level function), since
+        it is sent to the workers. The partition function only runs in this
+        process; it should differ from the hash function, or the keys of each
+        shard would all share the same hash residue and crowd its buckets.
+        """
+        self.shards = shards
+        self.hash_function = function
+        self.partition_function = partition_function
+        self._connections = []
+        self._workers = []
+
+        for _ in range(shards):
+            parent_end, child_end = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_shard_worker, args=(child_end, capacity, function),
+                daemon=True)
+            worker.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops every worker process. The hash map cannot be used afterwards.
+        """
+        for connection in self._connections:
+            connection.send(('close', ()))
+            connection.close()
+        for worker in self._workers:
+            worker.join()
+        self._connections = []
+        self._workers = []
+
+    def _shard_of(self, key) -> int:
+        """
+        Used internally to find the shard a key belongs to.
+        """
+        return self.partition_function(key) % self.shards
+
+    def _gather(self, busy: list) -> list:
+        """
+        Used internally to wait for the reply of every shard in busy.
+
+        Returns a list of their results, in the same order, or raises
+        HashMapException for the first request that failed in its worker.
+        Every reply is read before raising, so none is left in a pipe to be
+        taken for the reply to a later request.
+        """
+        replies = [self._connections[shard].recv() for shard in busy]
+        for shard, (status, result) in zip(busy, replies):
+            if status != 'ok':
+                raise HashMapException('shard ' + str(shard) + ': ' + result)
+        return [result for _, result in replies]
+
+    def _receive(self, shard: int) -> object:
+        """
+        Used internally to wait for a shard's reply.
+
+        Returns the result, or raises HashMapException if the request failed
+        in the worker.
+        """
+        return self._gather([shard])[0]
+
+    def _broadcast(self, command: str) -> list:
+        """
+        Used internally to run an argument-less command on every shard.
+
+        Returns a list of every shard's result.
+        """
+        for connection in self._connections:
+            connection.send((command, ()))
+        return self._gather(list(range(self.shards)))
+
+    def _split(self, keys: list) -> list:
+        """
+        Used internally to split keys by shard.
+
+        Returns a list holding, for each shard, the list of positions in keys
+        of the keys that belong to it.
+        """
+        positions = [[] for _ in range(self.shards)]
+        partition = self.partition_function
+        shards = self.shards
+        for i, key in enumerate(keys):
+            positions[partition(key) % shards].append(i)
+        return positions
+
+    def _scatter(self, command: str, keys: list, values: list = None):
+        """
+        Used internally to send every shard its part of a batch, then gather
+        the replies.
+
+        Returns a list with one result per key in the original order if the
+        command returns one, otherwise None.
+        """
+        positions = self._split(keys)
+        busy = []
+
+        # Sends every request before waiting on any reply, so all workers
+        # run at the same time
+        try:
+            for shard in range(self.shards):
+                if not positions[shard]:
+                    continue
+                shard_keys = [keys[i] for i in positions[shard]]
+                if values is None:
+                    arguments = (shard_keys,)
+                else:
+                    arguments = (shard_keys,
+                                 [values[i] for i in positions[shard]])
+                self._connections[shard].send((command, arguments))
+                busy.append(shard)
+        # If a request could not be sent (say, a value cannot be pickled),
+        # reads the replies to those already sent before giving up, so the
+        # pipes are left empty
+        except Exception:
+            for shard in busy:
+                self._connections[shard].recv()
+            raise
+
+        results = None
+        for shard, shard_results in zip(busy, self._gather(busy)):
+            if shard_results is None:
+                continue
+            if results is None:
+                results = [None] * len(keys)
+            for i, result in zip(positions[shard], shard_results):
+                results[i] = result
+        return results
+
+    @property
+    def size(self) -> int:
+        """
+        Number of key/value pairs held across all shards.
+        """
+        return sum(self._broadcast('size'))
+
+    def put(self, key, value: object) -> None:
+        """
+        Takes a key and an object to pair with the key and puts it in the
+        key's shard, replacing any object already paired with the key.
+        """
+        shard = self._shard_of(key)
+        self._connections[shard].send(('put_many', ([key], [value])))
+        self._receive(shard)
+
+    def get(self, key) -> object:
+        """
+        Returns the object associated with the specified key, or None if the
+        key is not in the hash map.
+        """
+        shard = self._shard_of(key)
+        self._connections[shard].send(('get_many', ([key],)))
+        return self._receive(shard)[0]
+
+    def remove(self, key) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+
+        If the specified key is not in the hash map, this does nothing.
+        """
+        shard = self._shard_of(key)
+        self._connections[shard].send(('remove_many', ([key],)))
+        self._receive(shard)
+
+    def contains_key(self, key) -> bool:
+        """
+        Returns True if the key is in the hash map.
+        Otherwise, returns False.
+        """
+        shard = self._shard_of(key)
+        self._connections[shard].send(('contains_many', ([key],)))
+        return self._receive(shard)[0]
+
+    def put_many(self, keys, values) -> None:
+        """
+        Takes an iterable of keys and one of objects to pair with them, in the
+        same order, and puts every pair in its shard.
+        """
+        keys = list(keys)
+        values = list(values)
+        if len(keys) != len(values):
+            raise HashMapException
+        self._scatter('put_many', keys, values)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Takes an iterable of keys.
+
+        Returns a Dynamic Array of the objects associated with the keys, in
+        the same order, with None for every key not in the hash map.
+        """
+        keys = list(keys)
+        return DynamicArray(self._scatter('get_many', keys) or [])
+
+    def remove_many(self, keys) -> None:
+        """
+        Takes an iterable of keys and removes each of them and its associated
+        value from its shard.
+        """
+        self._scatter('remove_many', list(keys))
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Takes an iterable of keys.
+
+        Returns a Dynamic Array of booleans, in the same order as the keys,
+        that are True for every key in the hash map.
+        """
+        keys = list(keys)
+        return DynamicArray(self._scatter('contains_many', keys) or [])
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a Dynamic Array containing all keys stored across the shards.
+        """
+        key_array = DynamicArray()
+        for shard_keys in self._broadcast('get_keys'):
+            for key in shard_keys:
+                key_array.append(key)
+        return key_array
+
+    def clear(self) -> None:
+        """
+        Clears the contents of every shard.
+        """
+        self._broadcast('clear')
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    import time
+
+    from hash_functions import fnv1a
+
+    print("\nsharded put_many / get_many example")
+    print("-----------------------------------")
+    keys = ['key' + str(i) for i in range(200000)]
+    values = list(range(200000))
+
+    for shards in (1, 2, 4):
+        with ShardedHashMap(shards, fnv1a, capacity=1 << 16) as m:
+            start = time.perf_counter()
+            for i in range(0, len(keys), 20000):
+                m.put_many(keys[i:i + 20000], values[i:i + 20000])
+            found = m.get_many(keys[::7])
+            seconds = time.perf_counter() - start
+            print('shards {}  size {}  first found {}  {:.2f}s'.format(
+                shards, m.size, found.get_at_index(1), seconds))
@@ -0,0 +1,337 @@
+# Course: CS261 - Data Structures
+# Student Name: Alexander Lubrano
+# Assignment: 5 - Hash Map Extensions: Binary Snapshots
+# Description: Defines a compact, versioned binary snapshot format for the
+#              HashMap, AVL and MinHeap classes, with streaming writers and
+#              readers that restore each structure in linear time: hash map
+#              links are placed with their saved hashes instead of calling
+#              the hash function (unless the hashes came from a function that
+#              gives different results in different processes, in which case
+#              every key is hashed again), the AVL tree is rebuilt directly
+#              from its sorted values with no rotations, and the heap array
+#              is restored as saved with no re-heapifying.
+#
+#              Snapshot layout (all integers little-endian):
+#                magic, format version, structure kind
+#                HashMap -- capacity, size, name of the hash function if its
+#                           hashes are the same in every process (otherwise
+#                           an empty name), then (hash, key, value) records
+#                AVL     -- count, then every value in sorted order
+#                MinHeap -- count, then every value in heap array order
+#              Every key and value is written with a one-byte type tag.
+#              Objects of other types are pickled, so only load snapshots
+#              from trusted sources.
+
+
+import pickle
+import struct
+
+# Import pre-written DynamicArray class
+from a5_include import *
+
+from avl import AVL, Stack
+from hash_functions import fnv1a, siphash24, stable_hash
+from hash_map import HashMap, hash_function_1, hash_function_2
+from min_heap import MinHeap
+
+
+_MAGIC = b'CS261SNP'
+_VERSION = 2
+
+# Structure kinds
+_KIND_HASH_MAP = b'H'
+_KIND_AVL = b'A'
+_KIND_MIN_HEAP = b'M'
+
+_HEADER = struct.Struct('<8sBc')
+_COUNT = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+# Type tags written before every key and value
+_TAG_NONE = b'N'
+_TAG_TRUE = b'T'
+_TAG_FALSE = b'F'
+_TAG_INT = b'i'
+_TAG_BIG_INT = b'I'
+_TAG_FLOAT = b'f'
+_TAG_STR = b's'
+_TAG_BYTES = b'b'
+_TAG_PICKLE = b'p'
+
+# Hash functions whose hashes are the same in every process, so hashes saved
+# with them can be reused when loading. Others, such as builtin_hash and
+# hash_generic, are seeded per process for str and bytes keys.
+_STABLE_FUNCTIONS = {function.__name__: function for function in (
+    hash_function_1, hash_function_2, fnv1a, siphash24, stable_hash)}
+
+
+class SnapshotException(Exception):
+    """
+    Custom exception raised when a snapshot cannot be read
+    """
+    pass
+
+
+def _write_value(stream, value) -> None:
+    """
+    Used internally to write a key or value to a stream with its type tag.
+
+    Objects of any other type than None, bool, int, float, str or bytes are
+    pickled.
+    """
+    value_type = type(value)
+
+    if value is None:
+        stream.write(_TAG_NONE)
+    elif value_type is bool:
+        stream.write(_TAG_TRUE if value else _TAG_FALSE)
+    elif value_type is int:
+        # Most ints fit in 8 bytes; the rest are written as signed bytes
+        if -2 ** 63 <= value < 2 ** 63:
+            stream.write(_TAG_INT + _INT.pack(value))
+        else:
+            data = value.to_bytes((value.bit_length() + 8) // 8, 'little',
+                                  signed=True)
+            stream.write(_TAG_BIG_INT + _LENGTH.pack(len(data)) + data)
+    elif value_type is float:
+        stream.write(_TAG_FLOAT + _FLOAT.pack(value))
+    elif value_type is str:
+        data = value.encode('utf-8')
+        stream.write(_TAG_STR + _LENGTH.pack(len(data)) + data)
+    elif value_type is bytes:
+        stream.write(_TAG_BYTES + _LENGTH.pack(len(value)) + value)
+    else:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        stream.write(_TAG_PICKLE + _LENGTH.pack(len(data)) + data)
+
+
+def _read_exact(stream, length: int) -> bytes:
+    """
+    Used internally to read exactly the specified number of bytes.
+    """
+    data = stream.read(length)
+    if len(data) != length:
+        raise SnapshotException('snapshot is truncated')
+    return data
+
+
+def _read_value(stream) -> object:
+    """
+    Used internally to read a key or value written by _write_value().
+    """
+    tag = _read_exact(stream, 1)
+
+    if tag == _TAG_NONE:
+        return None
+    if tag == _TAG_TRUE:
+        return True
+    if tag == _TAG_FALSE:
+        return False
+    if tag == _TAG_INT:
+        return _INT.unpack(_read_exact(stream, _INT.size))[0]
+    if tag == _TAG_FLOAT:
+        return _FLOAT.unpack(_read_exact(stream, _FLOAT.size))[0]
+
+    # Every remaining type is stored as a length followed by that many bytes
+    length = _LENGTH.unpack(_read_exact(stream, _LENGTH.size))[0]
+    data = _read_exact(stream, length)
+
+    if tag == _TAG_STR:
+        return data.decode('utf-8')
+    if tag == _TAG_BYTES:
+        return data
+    if tag == _TAG_BIG_INT:
+        return int.from_bytes(data, 'little', signed=True)
+    if tag == _TAG_PICKLE:
+        return pickle.loads(data)
+
+    raise SnapshotException('unknown type tag ' + repr(tag))
+
+
+def _write_header(stream, kind: bytes, count: int) -> None:
+    """
+    Used internally to write the snapshot header and item count.
+    """
+    stream.write(_HEADER.pack(_MAGIC, _VERSION, kind) + _COUNT.pack(count))
+
+
+def _read_header(stream, kind: bytes) -> int:
+    """
+    Used internally to check the snapshot header.
+
+    Returns the number of items in the snapshot.
+    """
+    magic, version, found_kind = _HEADER.unpack(
+        _read_exact(stream, _HEADER.size))
+    if magic != _MAGIC:
+        raise SnapshotException('not a snapshot')
+    if version != _VERSION:
+        raise SnapshotException('unsupported snapshot version ' +
+                                str(version))
+    if found_kind != kind:
+        raise SnapshotException('snapshot holds a different structure')
+    return _COUNT.unpack(_read_exact(stream, _COUNT.size))[0]
+
+
+def dump_hash_map(hash_map: HashMap, stream) -> None:
+    """
+    Takes a HashMap and a binary stream open for writing.
+
+    Writes the hash map's capacity and every key/object pair, along with the
+    hash cached for each key, to the stream one pair at a time. The name of
+    the hash function is written too if it is one of the functions whose
+    hashes are the same in every process.
+    """
+    _write_header(stream, _KIND_HASH_MAP, hash_map.capacity)
+    stream.write(_COUNT.pack(hash_map.size))
+
+    function = hash_map.hash_function
+    name = function.__name__ if \
+        _STABLE_FUNCTIONS.get(function.__name__) is function else ''
+    _write_value(stream, name)
+
+    for key_hash, key, value in hash_map.hashed_items():
+        _write_value(stream, key_hash)
+        _write_value(stream, key)
+        _write_value(stream, value)
+
+
+def load_hash_map(stream, function) -> HashMap:
+    """
+    Takes a binary stream holding a HashMap snapshot and the hash function
+    the hash map was saved with.
+
+    Returns a new HashMap with the saved capacity and contents. If the
+    snapshot was saved with the specified function and it is one whose
+    hashes are the same in every process (hash_function_1, hash_function_2,
+    fnv1a, siphash24 or stable_hash), each pair is placed using its saved
+    hash, so the function is not called. Otherwise, such as for builtin_hash
+    and hash_generic, whose hashes of str and bytes keys change between
+    processes, every key is hashed again with the specified function.
+    Pickled keys and values are unpickled, so only load snapshots from
+    trusted sources.
+    """
+    capacity = _read_header(stream, _KIND_HASH_MAP)
+    size = _COUNT.unpack(_read_exact(stream, _COUNT.size))[0]
+    name = _read_value(stream)
+
+    records = ((_read_value(stream), _read_value(stream), _read_value(stream))
+               for _ in range(size))
+
+    # Saved hashes can only be trusted if they came from this same function
+    # and it hashes the same way in every process
+    if name == '' or _STABLE_FUNCTIONS.get(name) is not function:
+        records = ((function(key), key, value) for _, key, value in records)
+
+    return HashMap.from_hashed_items(capacity, function, records)
+
+
+def dump_avl(tree: AVL, stream) -> None:
+    """
+    Takes an AVL tree and a binary stream open for writing.
+
+    Writes every value in the tree to the stream in sorted order.
+    """
+    # Counts the nodes first so the reader knows how many values follow
+    count = 0
+    s = Stack()
+    s.push(tree.root)
+    while not s.is_empty():
+        node = s.pop()
+        if node:
+            count += 1
+            s.push(node.left)
+            s.push(node.right)
+
+    _write_header(stream, _KIND_AVL, count)
+
+    # Iterative in-order traversal
+    s = Stack()
+    cur = tree.root
+    while cur is not None or not s.is_empty():
+        while cur is not None:
+            s.push(cur)
+            cur = cur.left
+        cur = s.pop()
+        _write_value(stream, cur.value)
+        cur = cur.right
+
+
+def load_avl(stream) -> AVL:
+    """
+    Takes a binary stream holding an AVL snapshot.
+
+    Returns a new, perfectly balanced AVL tree holding the saved values,
+    built in linear time without any rotations. Pickled values are
+    unpickled, so only load snapshots from trusted sources.
+    """
+    count = _read_header(stream, _KIND_AVL)
+    return AVL.from_sorted(_read_value(stream) for _ in range(count))
+
+
+def dump_min_heap(heap: MinHeap, stream) -> None:
+    """
+    Takes a MinHeap and a binary stream open for writing.
+
+    Writes every object in the heap to the stream in heap array order.
+    """
+    _write_header(stream, _KIND_MIN_HEAP, heap.heap.length())
+    for i in range(heap.heap.length()):
+        _write_value(stream, heap.heap.get_at_index(i))
+
+
+def load_min_heap(stream) -> MinHeap:
+    """
+    Takes a binary stream holding a MinHeap snapshot.
+
+    Returns a new MinHeap whose array is restored exactly as saved, which is
+    already a valid heap, so nothing is re-heapified. Pickled values are
+    unpickled, so only load snapshots from trusted sources.
+    """
+    count = _read_header(stream, _KIND_MIN_HEAP)
+
+    heap = MinHeap()
+    for _ in range(count):
+        heap.heap.append(_read_value(stream))
+    return heap
+
+
+# BASIC TESTING
+if __name__ == "__main__":
+
+    import io
+
+    from hash_map import hash_function_2
+
+    print("\nHashMap snapshot example")
+    print("------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(100):
+        m.put('key' + str(i), (i, i * 1.5) if i % 2 else i)
+    stream = io.BytesIO()
+    dump_hash_map(m, stream)
+    stream.seek(0)
+    restored = load_hash_map(stream, hash_function_2)
+    print(len(stream.getvalue()), 'bytes', restored.size, restored.capacity,
+          restored.get('key41'), restored.get('key42'))
+
+    print("\nAVL snapshot example")
+    print("--------------------")
+    avl = AVL(range(0, 34, 3))
+    stream = io.BytesIO()
+    dump_avl(avl, stream)
+    stream.seek(0)
+    restored = load_avl(stream)
+    print(avl)
+    print(restored, restored.is_valid_avl())
+
+    print("\nMinHeap snapshot example")
+    print("------------------------")
+    h = MinHeap(['fish', 'bird', 'monkey', 'zebra', 'elephant'])
+    stream = io.BytesIO()
+    dump_min_heap(h, stream)
+    stream.seek(0)
+    print(h)
+    print(load_min_heap(stream))